@@ -18,6 +18,8 @@ class Config:
     
     _instance: Optional['Config'] = None
     _config: Dict[str, Any] = {}
+    # 配置版本号：每次set/reload时递增，调用方可据此判断缓存是否过期
+    _version: int = 0
     
     def __new__(cls):
         if cls._instance is None:
@@ -33,17 +35,25 @@ class Config:
                 'interval_seconds': 5,
                 'roi_padding': 10,
                 'enable_roi': False,
-                'saved_roi': None
+                'saved_roi': None,
+                # 帧去重：与上一帧dHash的汉明距离小于该值时跳过OCR，0为关闭
+                'dedup_hamming': 3,
+                # 截图长边超过该值时缩小后再送OCR，0为不缩放
+                'max_dimension': 1280
             },
             'ocr': {
                 'default_engine': 'paddle',
                 'languages': ['ch', 'en'],
                 'min_confidence': 0.15,
                 'save_processed_image': True,
+                'batch_size': 4,
+                'batch_max_wait_ms': 200,
                 'easyocr': {
                     'canvas_size': 1920,
                     'mag_ratio': 1.5,
-                    'dynamic_params': True
+                    'dynamic_params': True,
+                    # GPU模式下用FP16推理（带宽减半+Tensor Core），失败自动回退FP32
+                    'fp16': False
                 }
             },
             'gpu': {
@@ -55,7 +65,9 @@ class Config:
                 'output_dir': 'output',
                 'banlist_file': 'docs/banlist.txt',
                 'save_screenshot': True,
-                'save_ocr_result': True
+                'save_ocr_result': True,
+                # 截图保存格式：jpg编码比PNG快5-10倍，截图只是临时调试产物
+                'screenshot_format': 'jpg'
             },
             'cleanup': {
                 'enabled': True,
@@ -141,6 +153,12 @@ class Config:
                 config[key] = {}
             config = config[key]
         config[keys[-1]] = value
+        Config._version += 1
+
+    @property
+    def version(self) -> int:
+        """当前配置版本号（任何set/reload都会使其递增）"""
+        return Config._version
     
     def save(self, config_file: Optional[str] = None):
         """
@@ -176,6 +194,7 @@ class Config:
     def reload(self):
         """重新加载配置文件"""
         self._load_config()
+        Config._version += 1
 
 
 # 全局配置实例
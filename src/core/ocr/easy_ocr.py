@@ -8,7 +8,7 @@ OCR识别模块
 import os
 import time
 from datetime import datetime
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any
 
 import easyocr
 import numpy as np
@@ -77,11 +77,33 @@ def init_reader(languages=None, use_gpu=None, force_reinit=False):
         logger.info("正在初始化 EasyOCR（首次运行会下载模型，请稍候）...")
         logger.info(f"GPU加速: {'启用' if _use_gpu else '未启用（使用CPU）'}")
         try:
-            _reader = easyocr.Reader(languages, gpu=_use_gpu)
+            # cudnn_benchmark让cuDNN针对固定输入尺寸自动选择最优卷积核
+            _reader = easyocr.Reader(languages, gpu=_use_gpu,
+                                     cudnn_benchmark=_use_gpu)
             logger.info("EasyOCR 初始化完成")
             if _use_gpu:
                 import torch
                 logger.info(f"确认使用设备: {torch.cuda.get_device_name(0) if torch.cuda.is_available() else 'CPU'}")
+                # 可选FP16：权重减半带宽、启用Tensor Core矩阵乘；
+                # 仅GPU模式有意义，失败时回退FP32继续
+                if config.get('ocr.easyocr.fp16', False):
+                    try:
+                        _reader.detector.half()
+                        _reader.recognizer.half()
+                        # half()本身几乎不会失败，真正的坑在推理时
+                        # EasyOCR内部喂FP32张量导致dtype不匹配，
+                        # 所以必须跑一次真实识别验证整条链路
+                        _reader.readtext(np.zeros((32, 32, 3), dtype=np.uint8))
+                        logger.info("EasyOCR 已切换到FP16推理")
+                    except Exception as e:
+                        logger.warning(f"切换FP16失败，回退FP32: {e}")
+                        try:
+                            _reader.detector.float()
+                            _reader.recognizer.float()
+                        except Exception:
+                            # 连回退都失败时重建FP32 Reader，保证OCR可用
+                            _reader = easyocr.Reader(languages, gpu=_use_gpu,
+                                                     cudnn_benchmark=_use_gpu)
         except Exception as e:
             logger.error(f"EasyOCR 初始化失败: {e}", exc_info=True)
             raise
@@ -89,13 +111,35 @@ def init_reader(languages=None, use_gpu=None, force_reinit=False):
     return _reader
 
 
-def recognize_text(image, languages=None, 
+def warmup(height, width):
+    """
+    用与ROI同尺寸的空白图预热EasyOCR
+    cudnn_benchmark开启后，首次遇到新输入尺寸会触发autotune；
+    提前跑两遍把这部分多百毫秒级的开销移出首次真实扫描
+
+    Args:
+        height (int): 预热图像高度（像素）
+        width (int): 预热图像宽度（像素）
+    """
+    if _reader is None or height <= 0 or width <= 0:
+        return
+
+    try:
+        dummy = np.zeros((int(height), int(width), 3), dtype=np.uint8)
+        for _ in range(2):
+            _reader.readtext_batched([dummy], n_width=int(width), n_height=int(height))
+        logger.debug(f"EasyOCR预热完成: {width}x{height}")
+    except Exception as e:
+        logger.debug(f"EasyOCR预热失败（不影响后续识别）: {e}")
+
+
+def recognize_text(image, languages=None,
                    min_confidence=0.15, use_gpu=None, roi=None):
     """
     对图片进行OCR文字识别
     
     Args:
-        image: PIL.Image对象或图片文件路径
+        image: PIL.Image对象、numpy数组（RGB）或图片文件路径
         languages (list): OCR语言列表，默认为 ['ch_sim', 'en']
         min_confidence (float): 最小置信度阈值，默认为0.15
         use_gpu (bool): 是否使用GPU，默认为None（自动检测）
@@ -114,19 +158,27 @@ def recognize_text(image, languages=None,
         
         if isinstance(image, str):
             image = Image.open(image)
-        
-        if roi is not None:
-            x1, y1, x2, y2 = roi
-            image = image.crop((x1, y1, x2, y2))
-        
-        img_array = np.array(image)
-        
+
+        if isinstance(image, np.ndarray):
+            # scan_screen已经返回ndarray，直接使用，省去一次转换拷贝
+            if roi is not None:
+                x1, y1, x2, y2 = roi
+                img_array = image[y1:y2, x1:x2]
+            else:
+                img_array = image
+            height, width = img_array.shape[:2]
+        else:
+            if roi is not None:
+                x1, y1, x2, y2 = roi
+                image = image.crop((x1, y1, x2, y2))
+            img_array = np.array(image)
+            width, height = image.size
+
         default_canvas_size = config.get('ocr.easyocr.canvas_size', 1920)
         default_mag_ratio = config.get('ocr.easyocr.mag_ratio', 1.5)
         dynamic_params = config.get('ocr.easyocr.dynamic_params', True)
         
         if dynamic_params:
-            width, height = image.size
             if width > 1920 or height > 1080:
                 canvas_size = min(default_canvas_size, 1280)
                 mag_ratio = min(default_mag_ratio, 1.0)
@@ -180,7 +232,65 @@ def recognize_text(image, languages=None,
         return "", 0.0
 
 
-def recognize_and_print(image, languages=None, save_dir="output", 
+def recognize_batch(images, languages=None, min_confidence=0.15, use_gpu=None):
+    """
+    批量OCR识别多张图片
+    使用EasyOCR的readtext_batched在一次前向中处理整批图片，
+    GPU下吞吐明显高于逐张调用；CPU下收益有限，调用方应按需启用
+
+    Args:
+        images: 图片列表（PIL.Image对象或numpy数组）
+        languages (list): OCR语言列表，默认为 ['ch_sim', 'en']
+        min_confidence (float): 最小置信度阈值，默认为0.15
+        use_gpu (bool): 是否使用GPU，默认为None（自动检测）
+
+    Returns:
+        List[List[Dict[str, Any]]]: 每张图片一个识别结果列表
+    """
+    global _reader
+
+    try:
+        if _reader is None:
+            init_reader(languages, use_gpu)
+
+        arrays = [img if isinstance(img, np.ndarray) else np.array(img) for img in images]
+
+        # readtext_batched要求整批同尺寸，尺寸不一时回退到逐张识别
+        if len({arr.shape for arr in arrays}) > 1:
+            return [recognize_text(arr, languages,
+                                   min_confidence=min_confidence, use_gpu=use_gpu)[0]
+                    for arr in arrays]
+
+        start_time = time.time()
+        batch_results = _reader.readtext_batched(
+            arrays,
+            n_width=arrays[0].shape[1],
+            n_height=arrays[0].shape[0]
+        )
+        ocr_duration = time.time() - start_time
+        logger.debug(f"批量OCR识别完成，共 {len(arrays)} 张，耗时: {ocr_duration:.3f}秒")
+
+        all_items: List[List[Dict[str, Any]]] = []
+        for results in batch_results:
+            text_items: List[Dict[str, Any]] = []
+            for (bbox, text, confidence) in results:
+                if confidence >= min_confidence:
+                    bbox_list = bbox.tolist() if hasattr(bbox, 'tolist') else list(bbox)
+                    text_items.append({
+                        'text': text,
+                        'confidence': float(confidence),
+                        'bbox': bbox_list
+                    })
+            text_items.sort(key=lambda x: x['bbox'][0][1])
+            all_items.append(text_items)
+        return all_items
+
+    except Exception as e:
+        logger.error(f"批量OCR识别时出错: {e}", exc_info=True)
+        return [[] for _ in images]
+
+
+def recognize_and_print(image, languages=None, save_dir="output",
                        timestamp=None, use_gpu=None, roi=None, save_result=True):
     """
     对图片进行OCR识别并保存结果到文件
@@ -211,13 +321,19 @@ def recognize_and_print(image, languages=None, save_dir="output",
     
     if not save_result:
         return text_items
-        
+
+    save_ocr_results(text_items, save_dir, timestamp, roi, ocr_duration)
+
+    return text_items
+
+
+def save_ocr_results(text_items, save_dir, timestamp, roi=None, ocr_duration=None):
+    """保存OCR结果到文件"""
     if timestamp is None:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    if not os.path.exists(save_dir):
-        os.makedirs(save_dir)
-    
+
+    os.makedirs(save_dir, exist_ok=True)
+
     save_dir_basename = os.path.basename(save_dir)
     is_minute_mode = (len(save_dir_basename) == 13 and 
                      save_dir_basename[8] == '_' and 
@@ -230,29 +346,30 @@ def recognize_and_print(image, languages=None, save_dir="output",
         txt_filename = os.path.join(save_dir, f"ocr_result_{timestamp}.txt")
     
     try:
+        # 先在内存中拼好整份报告，一次write落盘
+        # （几十次f.write意味着几十次Python-C边界跨越和编码调用）
+        parts = [f"识别时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"]
+        if roi:
+            parts.append(f"ROI区域: {roi}\n")
+        parts.append("="*60 + "\n\n")
+
+        for item in text_items:
+            parts.append(f"[置信度: {item['confidence']:.2f}] {item['text']}\n")
+
+        total_chars = sum(len(item['text']) for item in text_items)
+        avg_confidence = sum(item['confidence'] for item in text_items) / len(text_items) if text_items else 0
+
+        parts.append(f"\n--- 识别统计 ---\n")
+        parts.append(f"总字符数: {total_chars}\n")
+        parts.append(f"平均置信度: {avg_confidence:.2f}\n")
+        if ocr_duration is not None:
+            parts.append(f"OCR耗时: {ocr_duration:.3f}秒\n")
+
         with open(txt_filename, 'w', encoding='utf-8') as f:
-            f.write(f"识别时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            if roi:
-                f.write(f"ROI区域: {roi}\n")
-            f.write("="*60 + "\n\n")
-            
-            for item in text_items:
-                text = item['text']
-                confidence = item['confidence']
-                f.write(f"[置信度: {confidence:.2f}] {text}\n")
-
-            total_chars = sum(len(item['text']) for item in text_items)
-            avg_confidence = sum(item['confidence'] for item in text_items) / len(text_items) if text_items else 0
-
-            f.write(f"\n--- 识别统计 ---\n")
-            f.write(f"总字符数: {total_chars}\n")
-            f.write(f"平均置信度: {avg_confidence:.2f}\n")
-            f.write(f"OCR耗时: {ocr_duration:.3f}秒\n")
+            f.write("".join(parts))
         logger.info(f"OCR结果已保存到: {txt_filename}")
     except Exception as e:
         logger.error(f"保存OCR结果时出错: {e}", exc_info=True)
-    
-    return text_items
 
 
 def print_ocr_results(results):
@@ -56,15 +56,17 @@ class OCRConfig:
         self,
         languages: Optional[Union[str, List[str]]] = None,
         use_gpu: Optional[bool] = None,
-        engine: str = 'paddle'
+        engine: str = 'paddle',
+        rec_batch_num: Optional[int] = None
     ):
         """
         初始化OCR配置
-        
+
         Args:
             languages: 语言列表或字符串，如 ['ch', 'en'] 或 'ch'
             use_gpu: 是否使用GPU（None表示从配置文件读取）
             engine: OCR引擎类型，'paddle' 或 'easy'
+            rec_batch_num: PaddleOCR识别批大小（None表示按GPU/CPU自动选择）
         """
         self.engine = engine
         
@@ -81,8 +83,16 @@ class OCRConfig:
         
         # 处理GPU配置
         self.use_gpu = self._resolve_gpu_setting(use_gpu)
-        
-        logger.debug(f"OCRConfig初始化: engine={engine}, languages={self.languages}, use_gpu={self.use_gpu}")
+
+        # PaddleOCR识别批大小：大批量只在GPU上有收益；
+        # CPU上默认的6会多分配数百MiB的arena却不带来加速，压到1
+        if rec_batch_num is not None:
+            self.rec_batch_num = rec_batch_num
+        else:
+            self.rec_batch_num = 6 if self.use_gpu else 1
+
+        logger.debug(f"OCRConfig初始化: engine={engine}, languages={self.languages}, "
+                     f"use_gpu={self.use_gpu}, rec_batch_num={self.rec_batch_num}")
     
     def _resolve_gpu_setting(self, use_gpu: Optional[bool]) -> bool:
         """
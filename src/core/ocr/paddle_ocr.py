@@ -4,7 +4,6 @@ PaddleOCR 模块 - 屏幕扫描OCR识别程序的OCR引擎
 使用 PaddleOCR 替代 EasyOCR，提供更高的识别准确率
 """
 
-import glob
 import os
 import time
 from datetime import datetime
@@ -16,12 +15,113 @@ from paddleocr import PaddleOCR
 from ...config.config import config
 from ...utils.logger import logger
 
+__all__ = ['init_reader', 'recognize_and_print', 'save_ocr_results', 'print_ocr_results']
+
+
+class _PaddleOCRCache:
+    """
+    PaddleOCR实例缓存
+    将实例和配置收拢到单个对象中，避免模块被重复导入时产生两份模型缓存
+    （PaddleOCR模型权重约1GB，重复加载代价很高）
+    """
+
+    def __init__(self):
+        self.instance = None
+        self.config = None
+
+    def reset(self):
+        """释放缓存的实例和配置"""
+        self.instance = None
+        self.config = None
+
+
 # 全局OCR实例缓存
-_ocr_instance = None
-_ocr_config = None
+_cache = _PaddleOCRCache()
+
+# 结果提取函数（根据安装的PaddleOCR版本在init_reader中一次性确定，
+# 避免每次识别都做isinstance分支判断）
+_extract = None
+
+
+def _extract_v3_dict(ocr_result):
+    """提取PaddleOCR 3.x格式的识别结果（OCRResult字典）"""
+    texts = ocr_result.get('rec_texts', [])
+    scores = ocr_result.get('rec_scores', [])
+    polys = ocr_result.get('rec_polys', [])
+
+    extracted_text = []
+    for i, text in enumerate(texts):
+        extracted_text.append({
+            'text': text,
+            'confidence': float(scores[i]) if i < len(scores) else 1.0,
+            'bbox': polys[i].tolist() if i < len(polys) else None
+        })
+    return extracted_text
+
+
+def _extract_legacy_list(ocr_result):
+    """提取旧版本PaddleOCR格式的识别结果（嵌套列表）"""
+    extracted_text = []
+    for line in ocr_result:
+        if line and len(line) >= 2:
+            extracted_text.append({
+                'text': line[1][0],
+                'confidence': line[1][1],
+                'bbox': line[0]
+            })
+    return extracted_text
+
+
+def _extract_auto(ocr_result):
+    """按结果类型动态分发提取（版本探测失败时的回退路径）"""
+    if isinstance(ocr_result, dict):
+        return _extract_v3_dict(ocr_result)
+    elif isinstance(ocr_result, list) and len(ocr_result) > 0:
+        return _extract_legacy_list(ocr_result)
+    return []
+
+
+def _enable_memory_optim(ocr):
+    """
+    尽力在Paddle推理Config上开启显存/内存复用优化
+    默认Config不一定开启memory_optim，每次ocr.ocr都会分配新的中间张量；
+    开启后推理器可跨调用复用张量缓冲区，减少交互式扫描的分配抖动。
+    不同PaddleOCR版本的predictor属性路径差异很大，全部按尽力而为处理。
+    """
+    tuned = 0
+    for attr in ('text_detector', 'text_recognizer', 'text_classifier'):
+        try:
+            predictor_config = getattr(ocr, attr).predictor.config
+            predictor_config.enable_memory_optim()
+            predictor_config.switch_ir_optim(True)
+            tuned += 1
+        except Exception:
+            continue
+    if tuned:
+        logger.debug(f"已为 {tuned} 个Paddle推理器开启memory_optim")
+    else:
+        logger.debug("当前PaddleOCR版本未暴露推理Config，跳过memory_optim设置")
+
+
+def _probe_result_format(ocr):
+    """
+    用一张小空白图探测OCR输出格式，固定结果提取函数
+    只在init_reader中执行一次，之后识别路径无需再做类型判断
+    """
+    global _extract
+    try:
+        probe = ocr.ocr(np.full((32, 32, 3), 255, dtype=np.uint8))
+        if probe and len(probe) > 0 and isinstance(probe[0], dict):
+            _extract = _extract_v3_dict
+        else:
+            _extract = _extract_legacy_list
+        logger.debug(f"OCR结果格式探测完成: {_extract.__name__}")
+    except Exception as e:
+        logger.debug(f"OCR结果格式探测失败，使用动态分发: {e}")
+        _extract = _extract_auto
 
 
-def init_reader(languages=None, use_gpu=None, force_reinit=False):
+def init_reader(languages=None, use_gpu=None, force_reinit=False, rec_batch_num=None):
     """
     初始化PaddleOCR识别器
 
@@ -29,12 +129,11 @@ def init_reader(languages=None, use_gpu=None, force_reinit=False):
         languages: 语言选项 ('ch', 'en', 'chinese', 'english' 等)
         use_gpu: 是否使用GPU (True/False/None)
         force_reinit: 是否强制重新初始化
+        rec_batch_num: 识别批大小（None表示使用Paddle默认值；CPU下建议传1）
 
     Returns:
         PaddleOCR实例
     """
-    global _ocr_instance, _ocr_config
-
     # 处理语言参数
     if languages is None:
         ocr_lang = 'ch'
@@ -47,10 +146,15 @@ def init_reader(languages=None, use_gpu=None, force_reinit=False):
         ocr_lang = str(languages) if languages else 'ch'
 
     # 检查是否需要重新初始化（使用实际的 ocr_lang）
-    current_config = (ocr_lang, use_gpu)
-    if not force_reinit and _ocr_instance is not None and _ocr_config == current_config:
-        logger.debug("使用缓存的 PaddleOCR 实例")
-        return _ocr_instance
+    # rec_batch_num=None表示“不关心批大小”：识别路径未指定时直接复用
+    # 现有实例，避免第二次约1GB的模型加载并保留已设置的批大小上限
+    current_config = (ocr_lang, use_gpu, rec_batch_num)
+    if not force_reinit and _cache.instance is not None and _cache.config is not None:
+        cached_lang, cached_gpu, cached_rbn = _cache.config
+        if (cached_lang == ocr_lang and cached_gpu == use_gpu
+                and (rec_batch_num is None or rec_batch_num == cached_rbn)):
+            logger.debug("使用缓存的 PaddleOCR 实例")
+            return _cache.instance
 
     # 确定设备类型（新版本PaddleOCR使用device参数）
     device = 'gpu' if use_gpu else 'cpu'
@@ -64,39 +168,59 @@ def init_reader(languages=None, use_gpu=None, force_reinit=False):
         major_version = 2
 
     if major_version >= 3:
-        ocr = PaddleOCR(
-            lang=ocr_lang,
-            device=device,
-            enable_mkldnn=False,
-        )
+        kwargs = {
+            'lang': ocr_lang,
+            'device': device,
+            'enable_mkldnn': False,
+        }
+        if rec_batch_num is not None:
+            kwargs['text_rec_batch_size'] = rec_batch_num
     else:
-        ocr = PaddleOCR(
-            lang=ocr_lang,
-            use_gpu=use_gpu,
-            use_angle_cls=True,
-            enable_mkldnn=False,
-        )
+        kwargs = {
+            'lang': ocr_lang,
+            'use_gpu': use_gpu,
+            'use_angle_cls': True,
+            'enable_mkldnn': False,
+        }
+        if rec_batch_num is not None:
+            kwargs['rec_batch_num'] = rec_batch_num
+
+    try:
+        ocr = PaddleOCR(**kwargs)
+    except TypeError:
+        # 部分版本不接受批大小参数，去掉后重试
+        kwargs.pop('text_rec_batch_size', None)
+        kwargs.pop('rec_batch_num', None)
+        ocr = PaddleOCR(**kwargs)
 
     # 缓存实例和配置
-    _ocr_instance = ocr
-    _ocr_config = current_config
+    _cache.instance = ocr
+    _cache.config = current_config
+
+    # 尽力开启推理器的内存复用优化
+    _enable_memory_optim(ocr)
+
+    # 一次性确定结果提取函数，识别热路径不再做类型分支
+    _probe_result_format(ocr)
 
     return ocr
 
 
 def recognize_and_print(image, languages=None, save_dir="output",
-                        timestamp=None, use_gpu=None, roi=None, save_result=True):
+                        timestamp=None, use_gpu=None, roi=None, save_result=True,
+                        rec_batch_num=None):
     """
     使用PaddleOCR进行文字识别并保存结果
 
     Args:
-        image: PIL图像对象或numpy数组
+        image: PIL图像对象或numpy数组（RGB通道序）
         languages: 语言选项
         save_dir: 保存目录
         timestamp: 时间戳
         use_gpu: 是否使用GPU
         roi: ROI区域信息
         save_result: 是否保存OCR结果文件
+        rec_batch_num: 识别批大小（None表示沿用已初始化实例的设置）
 
     Returns:
         list: 识别结果列表
@@ -106,14 +230,17 @@ def recognize_and_print(image, languages=None, save_dir="output",
         os.makedirs(save_dir, exist_ok=True)
 
     # 初始化OCR（使用缓存的实例）
-    ocr = init_reader(languages, use_gpu)
+    ocr = init_reader(languages, use_gpu, rec_batch_num=rec_batch_num)
 
-    # 将PIL图像转换为numpy数组
+    # 将输入统一为BGR numpy数组
     if hasattr(image, 'convert'):  # PIL Image
         # 先转换为RGB（确保颜色通道正确）
         if image.mode != 'RGB':
             image = image.convert('RGB')
         img_array = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+    elif isinstance(image, np.ndarray) and image.ndim == 3:
+        # scan_screen返回的ndarray为RGB通道序
+        img_array = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
     else:
         img_array = image
 
@@ -145,15 +272,19 @@ def recognize_and_print(image, languages=None, save_dir="output",
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # 删除旧的processed_*.png文件（只保留最新一张）
-        processed_pattern = os.path.join(save_dir, "processed_*.png")
-        old_processed_files = glob.glob(processed_pattern)
-        if old_processed_files:
-            try:
-                for old_file in old_processed_files:
-                    os.remove(old_file)
-                logger.debug(f"已删除 {len(old_processed_files)} 张旧的处理后图像")
-            except Exception as e:
-                logger.warning(f"删除旧的处理后图像失败: {e}")
+        # os.scandir一次遍历完成匹配和类型判断，比glob+逐个stat省一半syscall
+        removed = 0
+        try:
+            with os.scandir(save_dir) as it:
+                for entry in it:
+                    if (entry.name.startswith("processed_") and entry.name.endswith(".png")
+                            and entry.is_file(follow_symlinks=False)):
+                        os.remove(entry.path)
+                        removed += 1
+            if removed:
+                logger.debug(f"已删除 {removed} 张旧的处理后图像")
+        except Exception as e:
+            logger.warning(f"删除旧的处理后图像失败: {e}")
         
         # 生成处理后图像的文件名
         processed_filename = os.path.join(save_dir, f"processed_{timestamp}.png")
@@ -173,38 +304,10 @@ def recognize_and_print(image, languages=None, save_dir="output",
         ocr_duration = time.time() - start_time
         logger.debug(f"OCR识别完成，结果类型: {type(result)}, 结果长度: {len(result) if result else 0}, 耗时: {ocr_duration:.3f}秒")
 
-        # 提取识别结果
+        # 提取识别结果（提取函数已在init_reader中按版本确定）
         extracted_text = []
-        if result and len(result) > 0:
-            # PaddleOCR 3.x 返回格式: [OCRResult对象]
-            # OCRResult 是一个字典，包含 rec_texts, rec_scores, rec_polys 等键
-            ocr_result = result[0]
-            
-            if isinstance(ocr_result, dict):
-                # 新版本格式
-                texts = ocr_result.get('rec_texts', [])
-                scores = ocr_result.get('rec_scores', [])
-                polys = ocr_result.get('rec_polys', [])
-                
-                for i, text in enumerate(texts):
-                    text_item = {
-                        'text': text,
-                        'confidence': float(scores[i]) if i < len(scores) else 1.0,
-                        'bbox': polys[i].tolist() if i < len(polys) else None
-                    }
-                    extracted_text.append(text_item)
-            elif isinstance(ocr_result, list) and len(ocr_result) > 0:
-                # 旧版本格式兼容
-                for line in ocr_result:
-                    if line and len(line) >= 2:
-                        text = line[1][0]
-                        confidence = line[1][1]
-                        text_item = {
-                            'text': text,
-                            'confidence': confidence,
-                            'bbox': line[0]
-                        }
-                        extracted_text.append(text_item)
+        if result and len(result) > 0 and result[0]:
+            extracted_text = (_extract or _extract_auto)(result[0])
 
         if extracted_text:
             logger.info(f"提取识别结果，共 {len(extracted_text)} 行")
@@ -230,44 +333,44 @@ def save_ocr_results(results, save_dir, timestamp, roi=None, ocr_duration=None):
     if not results:
         # 即使没有识别到文本也保存空结果文件
         result_file = os.path.join(save_dir, "ocr_result.txt")
+        # 在内存中拼好内容，一次write落盘
+        parts = [f"识别时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"]
+        if roi:
+            parts.append(f"ROI区域: {roi}\n")
+        parts.append("="*60 + "\n\n")
+        parts.append("未识别到任何文本\n")
+        if ocr_duration is not None:
+            parts.append(f"\nOCR耗时: {ocr_duration:.3f}秒\n")
         with open(result_file, 'w', encoding='utf-8') as f:
-            # 在文件开头显示基本信息
-            f.write(f"识别时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            if roi:
-                f.write(f"ROI区域: {roi}\n")
-            f.write("="*60 + "\n\n")
-            f.write("未识别到任何文本\n")
-            if ocr_duration is not None:
-                f.write(f"\nOCR耗时: {ocr_duration:.3f}秒\n")
+            f.write("".join(parts))
         logger.info(f"OCR结果已保存到: {result_file}")
         return
 
     # 生成结果文件名
     result_file = os.path.join(save_dir, "ocr_result.txt")
 
-    # 写入识别结果
+    # 先在内存中拼好整份报告，一次write落盘
+    parts = [f"识别时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"]
+    if roi:
+        parts.append(f"ROI区域: {roi}\n")
+    parts.append("="*60 + "\n\n")
+
+    # 识别结果
+    for item in results:
+        parts.append(f"[置信度: {item['confidence']:.2f}] {item['text']}\n")
+
+    # 统计信息
+    total_chars = sum(len(item['text']) for item in results)
+    avg_confidence = sum(item['confidence'] for item in results) / len(results) if results else 0
+
+    parts.append(f"\n--- 识别统计 ---\n")
+    parts.append(f"总字符数: {total_chars}\n")
+    parts.append(f"平均置信度: {avg_confidence:.2f}\n")
+    if ocr_duration is not None:
+        parts.append(f"OCR耗时: {ocr_duration:.3f}秒\n")
+
     with open(result_file, 'w', encoding='utf-8') as f:
-        # 在文件开头显示基本信息
-        f.write(f"识别时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        if roi:
-            f.write(f"ROI区域: {roi}\n")
-        f.write("="*60 + "\n\n")
-        
-        # 写入识别结果
-        for item in results:
-            text = item['text']
-            confidence = item['confidence']
-            f.write(f"[置信度: {confidence:.2f}] {text}\n")
-
-        # 添加统计信息
-        total_chars = sum(len(item['text']) for item in results)
-        avg_confidence = sum(item['confidence'] for item in results) / len(results) if results else 0
-
-        f.write(f"\n--- 识别统计 ---\n")
-        f.write(f"总字符数: {total_chars}\n")
-        f.write(f"平均置信度: {avg_confidence:.2f}\n")
-        if ocr_duration is not None:
-            f.write(f"OCR耗时: {ocr_duration:.3f}秒\n")
+        f.write("".join(parts))
 
 
 def print_ocr_results(results):
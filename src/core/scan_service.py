@@ -3,12 +3,44 @@
 封装扫描、OCR识别、匹配和文件保存的核心逻辑
 """
 
-import glob
+import concurrent.futures
 import os
+import queue
+import shutil
 import threading
 import time
 from datetime import datetime
-from typing import Optional, Dict, List, Any
+from typing import Callable, Optional, Dict, List, Any
+
+import numpy as np
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(nogil=True, cache=True, fastmath=True)
+    def _dhash_kernel(small):
+        """dHash位打包内核：固定8x9的数值小循环，是numba的理想目标"""
+        h = np.uint64(0)
+        for r in range(8):
+            for c in range(8):
+                h = (h << np.uint64(1)) | np.uint64(small[r, c + 1] > small[r, c])
+        return h
+
+    try:
+        # 导入时预编译一次（cache=True时命中磁盘缓存），首帧不付JIT代价
+        _dhash_kernel(np.zeros((8, 9), dtype=np.uint8))
+    except Exception:
+        NUMBA_AVAILABLE = False
 
 from .ocr.ocr_adapter import OCRConfig
 from ..config.config import config
@@ -16,6 +48,31 @@ from ..utils.logger import logger
 from ..utils.scan_screen import scan_screen
 from ..utils.text_matcher import _get_cached_matcher
 
+# 保护OCR引擎的初始化/释放：多个ScanService实例（GUI+脚本入口、测试）
+# 共享paddle_ocr/easy_ocr里的模块级模型单例，不能让加载和释放相互交错
+_init_lock = threading.Lock()
+
+
+def _dhash64(img_array: "np.ndarray") -> int:
+    """
+    计算帧的64位dHash：缩放到9x8灰度图后比较行内相邻像素并打包成整数
+    缩放+位运算只需微秒级，而一次OCR要几十到几百毫秒，
+    用它判断画面是否变化可让静止桌面下的OCR开销降为零
+    """
+    if CV2_AVAILABLE:
+        gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY) if img_array.ndim == 3 else img_array
+        small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    else:
+        gray = img_array.mean(axis=2).astype(np.uint8) if img_array.ndim == 3 else img_array
+        h, w = gray.shape[:2]
+        rows = np.linspace(0, h - 1, 8).astype(np.intp)
+        cols = np.linspace(0, w - 1, 9).astype(np.intp)
+        small = gray[np.ix_(rows, cols)]
+    if NUMBA_AVAILABLE:
+        return int(_dhash_kernel(np.ascontiguousarray(small, dtype=np.uint8)))
+    bits = (small[:, 1:] > small[:, :-1]).reshape(-1)
+    return int(np.packbits(bits).view('>u8')[0])
+
 
 class ScanService:
     """
@@ -29,18 +86,38 @@ class ScanService:
         self.roi = None
         self.is_running = False
         self._stop_event = threading.Event()
+        # OCR引擎大多不可重入，流水线模式下用锁保护
+        self._ocr_lock = threading.Lock()
+        self._pipeline_threads: List[threading.Thread] = []
+        # IO线程池：截图编码/写盘等慢IO移出扫描线程
+        self._io_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='scan-io')
+        # 防止上一轮清理还没跑完又触发下一轮
+        self._cleanup_lock = threading.Lock()
         
         # 运行时状态
         self.scan_count = 0
         self.last_scan_time = None
         self.output_count = 0
+
+        # 帧去重状态：上一帧的dHash和对应的识别/匹配结果
+        self._last_hash: Optional[int] = None
+        self._last_ocr: Optional[Dict[str, Any]] = None
         
         # 配置缓存（避免频繁读取）
+        self._cfg_version = -1
+        self._output_dir_ready = False
         self._cache_config()
-    
+
     def _cache_config(self):
-        """缓存常用配置"""
+        """缓存常用配置（仅在配置版本变化时才重新读取）"""
+        if self._cfg_version == config.version:
+            return
+        self._cfg_version = config.version
+        old_output_dir = getattr(self, 'output_dir', None)
         self.output_dir = config.get('files.output_dir', 'output')
+        if self.output_dir != old_output_dir:
+            self._output_dir_ready = False
         self.scan_interval = config.get('scan.interval_seconds', 5)
         self.roi_padding = config.get('scan.roi_padding', 10)
         self.enable_matching = config.get('matching.enabled', True)
@@ -52,6 +129,20 @@ class ScanService:
         # 新增配置：是否保存文件（默认开启以保持兼容性）
         self.save_screenshot = config.get('files.save_screenshot', True)
         self.save_ocr_result = config.get('files.save_ocr_result', True)
+
+        # 截图保存格式（jpg编码快得多，截图仅为临时调试产物）
+        fmt = str(config.get('files.screenshot_format', 'jpg')).lower()
+        self.screenshot_format = 'jpg' if fmt in ('jpg', 'jpeg') else 'png'
+
+        # 流水线模式下的OCR聚批参数（仅EasyOCR+GPU时生效）
+        self.ocr_batch_size = config.get('ocr.batch_size', 4)
+        self.ocr_batch_wait = config.get('ocr.batch_max_wait_ms', 200) / 1000.0
+
+        # 帧去重阈值（汉明距离），0表示关闭
+        self.dedup_hamming = config.get('scan.dedup_hamming', 3)
+
+        # 截图长边上限（超出则缩小后再送OCR），0表示不缩放
+        self.scan_max_dimension = config.get('scan.max_dimension', 1280)
     
     def init_ocr(self, engine_choice: str = 'paddle', languages: List[str] = None, use_gpu: bool = None):
         """
@@ -74,32 +165,38 @@ class ScanService:
             engine=self.ocr_engine
         )
         
-        # 直接初始化对应引擎
-        if self.ocr_engine == 'paddle':
-            logger.info("正在初始化 PaddleOCR 模型...")
-            from .ocr import paddle_ocr
-            paddle_ocr.init_reader(
-                languages=self.ocr_config.get_paddle_params()['lang'],
-                use_gpu=self.ocr_config.use_gpu
-            )
-            logger.info("PaddleOCR 模型初始化完成")
-        else:
-            logger.info("正在初始化 EasyOCR 模型...")
-            from .ocr import easy_ocr
-            easy_ocr.init_reader(
-                languages=self.ocr_config.get_easy_params()['languages'],
-                use_gpu=self.ocr_config.use_gpu
-            )
-            logger.info("EasyOCR 模型初始化完成")
-    
+        # 直接初始化对应引擎（底层init_reader复用模块级模型单例，
+        # 相同配置的重复init不会再次加载模型）
+        with _init_lock:
+            if self.ocr_engine == 'paddle':
+                logger.info("正在初始化 PaddleOCR 模型...")
+                from .ocr import paddle_ocr
+                paddle_ocr.init_reader(
+                    languages=self.ocr_config.get_paddle_params()['lang'],
+                    use_gpu=self.ocr_config.use_gpu,
+                    rec_batch_num=self.ocr_config.rec_batch_num
+                )
+                logger.info("PaddleOCR 模型初始化完成")
+            else:
+                logger.info("正在初始化 EasyOCR 模型...")
+                from .ocr import easy_ocr
+                easy_ocr.init_reader(
+                    languages=self.ocr_config.get_easy_params()['languages'],
+                    use_gpu=self.ocr_config.use_gpu
+                )
+                logger.info("EasyOCR 模型初始化完成")
+
     def release_resources(self):
         """释放资源（OCR模型等）"""
-        if self.ocr_engine == 'paddle':
-            from .ocr import paddle_ocr
-            paddle_ocr._ocr_instance = None
-        else:
-            from .ocr import easy_ocr
-            easy_ocr._reader = None
+        with _init_lock:
+            if self.ocr_engine == 'paddle':
+                from .ocr import paddle_ocr
+                paddle_ocr._cache.reset()
+            else:
+                from .ocr import easy_ocr
+                easy_ocr._reader = None
+        # 等待挂起的IO任务（截图写盘等）完成
+        self._io_pool.shutdown(wait=True)
         import gc
         gc.collect()
         logger.info("OCR资源已释放")
@@ -107,7 +204,18 @@ class ScanService:
     def set_roi(self, roi):
         """设置ROI区域"""
         self.roi = roi
-        
+
+        # ROI尺寸确定后预热EasyOCR，让cuDNN autotune锁定该输入形状
+        # （全屏模式下尺寸未知，跳过预热）
+        if (roi is not None and self.ocr_engine == 'easy'
+                and self.ocr_config is not None and self.ocr_config.use_gpu):
+            from .ocr import easy_ocr
+            x1, y1, x2, y2 = roi
+            easy_ocr.warmup(
+                height=(y2 - y1) + 2 * self.roi_padding,
+                width=(x2 - x1) + 2 * self.roi_padding
+            )
+
     def scan_once(self) -> Dict[str, Any]:
         """
         执行一次完整的扫描流程
@@ -131,70 +239,56 @@ class ScanService:
         start_time = time.time()
         
         try:
-            # 1. 准备保存目录
-            now = datetime.now()
-            self._prepare_save_dir(now)
-            second_timestamp = now.strftime("%Y%m%d_%H%M%S")
+            # 1. 准备保存目录（时间戳只格式化一次，后续统一复用该字符串）
+            second_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self._prepare_save_dir()
             result['timestamp'] = second_timestamp
             
-            # 2. 截图
-            screenshot, _ = scan_screen(
+            # 2. 截图（PNG编码在IO线程池中完成）
+            screenshot, _, _ = scan_screen(
                 save_dir=self.output_dir,
                 save_file=self.save_screenshot,
                 timestamp=second_timestamp,
                 roi=self.roi,
-                padding=self.roi_padding
+                padding=self.roi_padding,
+                executor=self._io_pool,
+                image_format=self.screenshot_format,
+                max_dimension=self.scan_max_dimension
             )
-            
-            if screenshot:
+
+            if screenshot is not None:
                 if self.save_screenshot:
-                    result['screenshot_path'] = os.path.join(self.output_dir, f"screenshot_{second_timestamp}.png")
+                    result['screenshot_path'] = os.path.join(
+                        self.output_dir,
+                        f"screenshot_{second_timestamp}.{self.screenshot_format}")
                 
-                # 3. OCR识别
+                # 3. OCR识别（画面与上一帧几乎相同时直接复用上次结果）
                 if self.ocr_engine:
-                    # 直接调用底层OCR模块（使用缓存的配置）
-                    if self.ocr_engine == 'paddle':
-                        from .ocr import paddle_ocr
-                        ocr_results = paddle_ocr.recognize_and_print(
-                            screenshot,
-                            languages=self.ocr_config.get_paddle_params()['lang'],
-                            save_dir=self.output_dir,
-                            timestamp=second_timestamp,
-                            use_gpu=self.ocr_config.use_gpu,
-                            roi=None,
-                            save_result=self.save_ocr_result
-                        )
+                    frame_hash = _dhash64(screenshot) if self.dedup_hamming > 0 else None
+                    if self._is_duplicate_frame(frame_hash):
+                        result['ocr_text'] = self._last_ocr['ocr_text']
+                        result['matches'] = self._last_ocr['matches']
+                        result['cached'] = True
                     else:
-                        from .ocr import easy_ocr
-                        ocr_results = easy_ocr.recognize_and_print(
-                            screenshot,
-                            languages=self.ocr_config.get_easy_params()['languages'],
-                            save_dir=self.output_dir,
-                            timestamp=second_timestamp,
-                            use_gpu=self.ocr_config.use_gpu,
-                            roi=None,
-                            save_result=self.save_ocr_result
-                        )
-                    
-                    # 统一结果格式
-                    ocr_list = self._normalize_ocr_results(ocr_results)
-                    result['ocr_text'] = ocr_list
-                    
-                    # 4. 关键词匹配
-                    if self.enable_matching and ocr_list:
-                        # 使用缓存的匹配器进行匹配
-                        matcher = _get_cached_matcher(self.banlist_file)
-                        matches = matcher.match(ocr_list)
-                        result['matches'] = matches
-                        
+                        ocr_list = self._run_ocr(screenshot, second_timestamp)
+                        result['ocr_text'] = ocr_list
+
+                        # 4. 关键词匹配
+                        result['matches'] = self._match_keywords(ocr_list)
+
+                        self._last_hash = frame_hash
+                        self._last_ocr = {'ocr_text': ocr_list,
+                                          'matches': result['matches']}
+
                 result['success'] = True
                 
-                # 每10次扫描清空一次
-                self.output_count += 1
-                if self.output_count >= 10:
-                    self.output_count = 0
-                    self._cleanup_old_outputs()
-                    
+                # 每10次扫描清空一次（没有文件落盘时完全跳过清理）
+                if self.save_screenshot or self.save_ocr_result:
+                    self.output_count += 1
+                    if self.output_count >= 10:
+                        self.output_count = 0
+                        self._schedule_cleanup()
+
         except Exception as e:
             logger.error(f"扫描流程出错: {e}", exc_info=True)
             result['error'] = str(e)
@@ -202,26 +296,264 @@ class ScanService:
         result['duration'] = time.time() - start_time
         return result
 
-    def _prepare_save_dir(self, now: datetime) -> str:
-        """准备保存目录"""
-        os.makedirs(self.output_dir, exist_ok=True)
+    def _is_duplicate_frame(self, frame_hash: Optional[int]) -> bool:
+        """判断当前帧是否与上一帧几乎相同（dHash汉明距离小于阈值）"""
+        if frame_hash is None or self._last_hash is None or self._last_ocr is None:
+            return False
+        return bin(frame_hash ^ self._last_hash).count('1') < self.dedup_hamming
+
+    def _run_ocr(self, screenshot, timestamp: str) -> List[Dict[str, Any]]:
+        """执行OCR识别并统一结果格式（直接调用底层OCR模块，使用缓存的配置）"""
+        with self._ocr_lock:
+            if self.ocr_engine == 'paddle':
+                from .ocr import paddle_ocr
+                ocr_results = paddle_ocr.recognize_and_print(
+                    screenshot,
+                    languages=self.ocr_config.get_paddle_params()['lang'],
+                    save_dir=self.output_dir,
+                    timestamp=timestamp,
+                    use_gpu=self.ocr_config.use_gpu,
+                    roi=None,
+                    save_result=self.save_ocr_result,
+                    rec_batch_num=self.ocr_config.rec_batch_num
+                )
+            else:
+                from .ocr import easy_ocr
+                ocr_results = easy_ocr.recognize_and_print(
+                    screenshot,
+                    languages=self.ocr_config.get_easy_params()['languages'],
+                    save_dir=self.output_dir,
+                    timestamp=timestamp,
+                    use_gpu=self.ocr_config.use_gpu,
+                    roi=None,
+                    save_result=self.save_ocr_result
+                )
+        return self._normalize_ocr_results(ocr_results)
+
+    def _match_keywords(self, ocr_list: List[Dict[str, Any]]) -> List[str]:
+        """对OCR结果做关键词匹配（使用缓存的匹配器）"""
+        if not (self.enable_matching and ocr_list):
+            return []
+        matcher = _get_cached_matcher(self.banlist_file)
+        return matcher.match(ocr_list)
+
+    def start_pipeline(self, on_result: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        启动流水线扫描模式
+        截图、OCR识别、匹配三个阶段各占一个线程，由有界队列衔接，
+        截图I/O与OCR计算相互重叠，单周期耗时趋近于最慢阶段而不是各阶段之和
+
+        Args:
+            on_result: 每次扫描完成后的回调，参数为与scan_once相同格式的结果字典
+        """
+        if self.is_running:
+            logger.warning("流水线扫描已在运行中")
+            return
+
+        self._stop_event.clear()
+        self.is_running = True
+        capture_q: "queue.Queue" = queue.Queue(maxsize=2)
+        ocr_q: "queue.Queue" = queue.Queue(maxsize=2)
+
+        self._pipeline_threads = [
+            threading.Thread(target=self._capture_worker, args=(capture_q,),
+                             name='scan-capture', daemon=True),
+            threading.Thread(target=self._ocr_worker, args=(capture_q, ocr_q),
+                             name='scan-ocr', daemon=True),
+            threading.Thread(target=self._match_worker, args=(ocr_q, on_result),
+                             name='scan-match', daemon=True),
+        ]
+        for t in self._pipeline_threads:
+            t.start()
+        logger.info("流水线扫描已启动")
+
+    def stop_pipeline(self):
+        """停止流水线扫描并等待线程退出"""
+        self._stop_event.set()
+        for t in self._pipeline_threads:
+            t.join(timeout=5)
+        self._pipeline_threads = []
+        self.is_running = False
+        logger.info("流水线扫描已停止")
+
+    def _capture_worker(self, capture_q: "queue.Queue"):
+        """截图阶段：按扫描间隔截图并送入队列"""
+        while not self._stop_event.is_set():
+            start_time = time.time()
+            try:
+                self._cache_config()
+                second_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                self._prepare_save_dir()
+
+                screenshot, _, _ = scan_screen(
+                    save_dir=self.output_dir,
+                    save_file=self.save_screenshot,
+                    timestamp=second_timestamp,
+                    roi=self.roi,
+                    padding=self.roi_padding,
+                    executor=self._io_pool,
+                    image_format=self.screenshot_format,
+                    max_dimension=self.scan_max_dimension
+                )
+                if screenshot is not None:
+                    # 队列满时轮询等待，以便能响应停止事件
+                    while not self._stop_event.is_set():
+                        try:
+                            capture_q.put((screenshot, second_timestamp, start_time), timeout=0.5)
+                            break
+                        except queue.Full:
+                            continue
+            except Exception as e:
+                logger.error(f"截图阶段出错: {e}", exc_info=True)
+
+            self._stop_event.wait(max(0, self.scan_interval - (time.time() - start_time)))
+
+    def _batch_ocr_enabled(self) -> bool:
+        """是否启用OCR聚批（批量前向只在EasyOCR+GPU时有吞吐收益）"""
+        return (self.ocr_engine == 'easy'
+                and self.ocr_config is not None
+                and self.ocr_config.use_gpu
+                and self.ocr_batch_size > 1)
+
+    def _run_ocr_batch(self, batch) -> List[List[Dict[str, Any]]]:
+        """将排队的多张截图合并为一次OCR前向"""
+        from .ocr import easy_ocr
+
+        images = [item[0] for item in batch]
+        with self._ocr_lock:
+            results_lists = easy_ocr.recognize_batch(
+                images,
+                languages=self.ocr_config.get_easy_params()['languages'],
+                min_confidence=config.get('ocr.min_confidence', 0.3),
+                use_gpu=self.ocr_config.use_gpu
+            )
+
+        if self.save_ocr_result:
+            for (_, timestamp, _), text_items in zip(batch, results_lists):
+                easy_ocr.save_ocr_results(text_items, self.output_dir, timestamp)
+
+        return [self._normalize_ocr_results(items) for items in results_lists]
+
+    def _ocr_worker(self, capture_q: "queue.Queue", ocr_q: "queue.Queue"):
+        """OCR阶段：从队列取截图做识别，结果送入下一级队列"""
+        while not self._stop_event.is_set():
+            try:
+                batch = [capture_q.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+
+            # 数量或时间触发的聚批：凑满batch_size张或最早一帧等待超时即冲刷
+            if self._batch_ocr_enabled():
+                deadline = time.monotonic() + self.ocr_batch_wait
+                while len(batch) < self.ocr_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(capture_q.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+
+            try:
+                if not self.ocr_engine:
+                    results_lists = [[] for _ in batch]
+                elif len(batch) == 1:
+                    results_lists = [self._run_ocr(batch[0][0], batch[0][1])]
+                else:
+                    results_lists = self._run_ocr_batch(batch)
+
+                for (_, timestamp, start_time), ocr_list in zip(batch, results_lists):
+                    ocr_q.put((ocr_list, timestamp, start_time))
+            except Exception as e:
+                logger.error(f"OCR阶段出错: {e}", exc_info=True)
+
+    def _match_worker(self, ocr_q: "queue.Queue",
+                      on_result: Optional[Callable[[Dict[str, Any]], None]]):
+        """匹配阶段：关键词匹配、清理计数，并向调用方回调结果"""
+        while not self._stop_event.is_set():
+            try:
+                ocr_list, timestamp, start_time = ocr_q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                result = {
+                    'success': True,
+                    'timestamp': timestamp,
+                    'ocr_text': ocr_list,
+                    'matches': self._match_keywords(ocr_list),
+                    'duration': time.time() - start_time,
+                    'screenshot_path': (os.path.join(
+                        self.output_dir,
+                        f"screenshot_{timestamp}.{self.screenshot_format}")
+                        if self.save_screenshot else None)
+                }
+
+                if self.save_screenshot or self.save_ocr_result:
+                    self.output_count += 1
+                    if self.output_count >= 10:
+                        self.output_count = 0
+                        self._schedule_cleanup()
+
+                if on_result is not None:
+                    on_result(result)
+            except Exception as e:
+                logger.error(f"匹配阶段出错: {e}", exc_info=True)
+
+    def _prepare_save_dir(self) -> str:
+        """准备保存目录（目录只创建一次，之后跳过syscall）"""
+        if not self._output_dir_ready:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self._output_dir_ready = True
         return self.output_dir
 
+    def _schedule_cleanup(self):
+        """把清理任务丢到IO线程池，扫描/匹配线程不等目录遍历"""
+        self._io_pool.submit(self._cleanup_old_outputs)
+
     def _cleanup_old_outputs(self):
-        """清理旧输出文件，删除全部历史截图和OCR结果"""
+        """
+        清理旧输出文件，删除全部历史截图和OCR结果
+        旧文件先rename进一个临时目录（每个文件1次rename），
+        再在后台线程一次性rmtree，避免扫描线程阻塞在逐个unlink上
+        """
+        # 上一轮清理还在进行时直接放弃本轮，下个周期自然会再触发
+        if not self._cleanup_lock.acquire(blocking=False):
+            return
         try:
-            os.makedirs(self.output_dir, exist_ok=True)
-            
-            for f in glob.glob(os.path.join(self.output_dir, "*")):
-                if os.path.isfile(f):
-                    filename = os.path.basename(f)
-                    if filename.startswith("screenshot_") or filename.startswith("ocr_result_"):
-                        try:
-                            os.remove(f)
-                        except OSError:
-                            pass
+            # 输出目录不存在说明从未写过文件，直接短路
+            if not os.path.isdir(self.output_dir):
+                return
+
+            trash_dir = os.path.join(self.output_dir, f".trash_{time.monotonic_ns()}")
+            moved = 0
+            # os.scandir复用目录项自带的文件类型信息，
+            # 比glob.glob + os.path.isfile少一次stat/文件
+            with os.scandir(self.output_dir) as it:
+                for entry in it:
+                    name = entry.name
+                    if not (name.startswith("screenshot_") or name.startswith("ocr_result_")):
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    try:
+                        if moved == 0:
+                            os.makedirs(trash_dir, exist_ok=True)
+                        os.rename(entry.path, os.path.join(trash_dir, name))
+                        moved += 1
+                    except OSError:
+                        pass
+
+            if moved:
+                threading.Thread(
+                    target=shutil.rmtree,
+                    args=(trash_dir,),
+                    kwargs={'ignore_errors': True},
+                    daemon=True
+                ).start()
         except Exception:
             pass
+        finally:
+            self._cleanup_lock.release()
 
     def _normalize_ocr_results(self, results) -> List[Dict[str, Any]]:
         """统一OCR结果格式为列表"""
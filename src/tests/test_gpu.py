@@ -2,78 +2,107 @@
 测试GPU加速是否被EasyOCR正确使用
 """
 
-import torch
-import easyocr
-from datetime import datetime
-
-print("=" * 60)
-print("GPU加速测试")
-print("=" * 60)
-
-# 1. 检查PyTorch的GPU支持
-print("\n[1] PyTorch GPU支持检查:")
-print(f"PyTorch版本: {torch.__version__}")
-print(f"CUDA可用: {torch.cuda.is_available()}")
-if torch.cuda.is_available():
-    print(f"CUDA版本: {torch.version.cuda}")
-    print(f"GPU数量: {torch.cuda.device_count()}")
-    print(f"GPU名称: {torch.cuda.get_device_name(0)}")
-else:
-    print("警告: CUDA不可用，将使用CPU模式")
-
-# 2. 检查EasyOCR的GPU支持
-print("\n[2] EasyOCR GPU支持检查:")
-try:
+import os
+
+# 必须在torch/easyocr导入前设置：限制OpenMP/MKL的intra-op线程数，
+# 小输入下多线程协调开销反而拖慢OCR，并且会抢占外层并行的核
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+os.environ.setdefault('MKL_NUM_THREADS', '1')
+
+
+def main():
+    """执行GPU加速检测（重量级导入放在函数内，收集/跳过时不加载torch）"""
+    import time
+
+    import torch
     import easyocr
-    print(f"EasyOCR版本: {easyocr.__version__}")
-except AttributeError:
-    print("EasyOCR已安装（无法获取版本信息）")
 
-# 3. 测试EasyOCR初始化（GPU模式）
-print("\n[3] 测试EasyOCR初始化（GPU模式）:")
-try:
+    # 通过模块级单例初始化：测试结束后Reader留在缓存中，
+    # 同进程后续的识别调用不用再付一次模型加载
+    from src.core.ocr import easy_ocr
+
+    print("=" * 60)
+    print("GPU加速测试")
+    print("=" * 60)
+
+    # 1. 检查PyTorch的GPU支持
+    print("\n[1] PyTorch GPU支持检查:")
+    print(f"PyTorch版本: {torch.__version__}")
+    print(f"CUDA可用: {torch.cuda.is_available()}")
     if torch.cuda.is_available():
-        print("正在初始化EasyOCR（GPU模式）...")
-        start_time = datetime.now()
-        reader = easyocr.Reader(['ch_sim', 'en'], gpu=True)
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
+        print(f"CUDA版本: {torch.version.cuda}")
+        print(f"GPU数量: {torch.cuda.device_count()}")
+        print(f"GPU名称: {torch.cuda.get_device_name(0)}")
+    else:
+        print("警告: CUDA不可用，将使用CPU模式")
+
+    # 2. 检查EasyOCR的GPU支持
+    print("\n[2] EasyOCR GPU支持检查:")
+    try:
+        print(f"EasyOCR版本: {easyocr.__version__}")
+    except AttributeError:
+        print("EasyOCR已安装（无法获取版本信息）")
+
+    # 3. 测试EasyOCR初始化（GPU模式）
+    print("\n[3] 测试EasyOCR初始化（GPU模式）:")
+    try:
+        if torch.cuda.is_available():
+            print("正在初始化EasyOCR（GPU模式）...")
+            # perf_counter直接读单调时钟，比datetime相减更准且无对象分配
+            start_time = time.perf_counter()
+            reader = easy_ocr.init_reader(['ch_sim', 'en'], use_gpu=True)
+            duration = time.perf_counter() - start_time
+            print(f"初始化成功（耗时: {duration:.2f}秒）")
+            print("确认: EasyOCR正在使用GPU加速")
+        else:
+            print("跳过GPU测试（CUDA不可用）")
+    except Exception as e:
+        print(f"初始化失败: {e}")
+
+    # 4. 测试EasyOCR初始化（CPU模式）
+    print("\n[4] 测试EasyOCR初始化（CPU模式）:")
+    try:
+        print("正在初始化EasyOCR（CPU模式）...")
+        start_time = time.perf_counter()
+        reader = easy_ocr.init_reader(['ch_sim', 'en'], use_gpu=False)
+        duration = time.perf_counter() - start_time
         print(f"初始化成功（耗时: {duration:.2f}秒）")
-        print("确认: EasyOCR正在使用GPU加速")
+        print("确认: EasyOCR正在使用CPU模式")
+    except Exception as e:
+        print(f"初始化失败: {e}")
+
+    # 5. 性能对比建议
+    print("\n[5] 性能对比建议:")
+    if torch.cuda.is_available():
+        print("✓ GPU可用，建议在配置文件中设置:")
+        print("  gpu:")
+        print("    force_gpu: true")
+        print("    或")
+        print("    auto_detect: true")
     else:
-        print("跳过GPU测试（CUDA不可用）")
-except Exception as e:
-    print(f"初始化失败: {e}")
-
-# 4. 测试EasyOCR初始化（CPU模式）
-print("\n[4] 测试EasyOCR初始化（CPU模式）:")
-try:
-    print("正在初始化EasyOCR（CPU模式）...")
-    start_time = datetime.now()
-    reader = easyocr.Reader(['ch_sim', 'en'], gpu=False)
-    end_time = datetime.now()
-    duration = (end_time - start_time).total_seconds()
-    print(f"初始化成功（耗时: {duration:.2f}秒）")
-    print("确认: EasyOCR正在使用CPU模式")
-except Exception as e:
-    print(f"初始化失败: {e}")
-
-# 5. 性能对比建议
-print("\n[5] 性能对比建议:")
-if torch.cuda.is_available():
-    print("✓ GPU可用，建议在配置文件中设置:")
-    print("  gpu:")
-    print("    force_gpu: true")
-    print("    或")
-    print("    auto_detect: true")
-else:
-    print("✗ GPU不可用，将使用CPU模式")
-    print("  如果您的系统有NVIDIA GPU，请检查:")
-    print("  1. 是否安装了NVIDIA驱动")
-    print("  2. 是否安装了CUDA工具包")
-    print("  3. 是否安装了支持CUDA的PyTorch版本")
-
-print("\n" + "=" * 60)
-print("测试完成")
-print("=" * 60)
+        print("✗ GPU不可用，将使用CPU模式")
+        print("  如果您的系统有NVIDIA GPU，请检查:")
+        print("  1. 是否安装了NVIDIA驱动")
+        print("  2. 是否安装了CUDA工具包")
+        print("  3. 是否安装了支持CUDA的PyTorch版本")
+
+    print("\n" + "=" * 60)
+    print("测试完成")
+    print("=" * 60)
+
+
+def test_gpu():
+    """pytest入口：缺少torch/easyocr时自动跳过，不影响收集速度"""
+    import pytest
+    pytest.importorskip('torch')
+    pytest.importorskip('easyocr')
+    main()
+
 
+if __name__ == "__main__":
+    # 直接运行脚本时把仓库根目录加入sys.path，保证src包可导入
+    import sys
+    sys.path.insert(0, os.path.abspath(
+        os.path.join(os.path.dirname(__file__), '..', '..')))
+    main()
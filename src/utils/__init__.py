@@ -1,8 +1,4 @@
 """工具模块"""
-from .gui_logger import GUILoggerHandler
-from .logger import logger, setup_logger
-from .scan_screen import scan_screen, select_roi_interactive
-from .text_matcher import match_and_display, TextMatcher
 
 __all__ = [
     'logger', 'setup_logger',
@@ -11,3 +7,23 @@ __all__ = [
     'GUILoggerHandler'
 ]
 
+# PEP 562延迟导入：import src.utils 不再连带加载tkinter/PIL等重依赖，
+# 首次访问某个名字时才导入对应子模块
+_LAZY_IMPORTS = {
+    'logger': '.logger',
+    'setup_logger': '.logger',
+    'scan_screen': '.scan_screen',
+    'select_roi_interactive': '.scan_screen',
+    'match_and_display': '.text_matcher',
+    'TextMatcher': '.text_matcher',
+    'GUILoggerHandler': '.gui_logger',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        from importlib import import_module
+        value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
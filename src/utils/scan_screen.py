@@ -4,13 +4,150 @@
 支持ROI（感兴趣区域）选择
 """
 
+import atexit
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-from PIL import ImageGrab
+import numpy as np
+from PIL import Image, ImageGrab
 
 from .logger import logger
 
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+
+try:
+    import dxcam
+    DXCAM_AVAILABLE = True
+except ImportError:
+    DXCAM_AVAILABLE = False
+
+# 复用的mss抓屏实例（原生BitBlt/XShm直接写入预分配缓冲，比ImageGrab快数倍）
+_SCT = None
+
+# 复用的dxcam实例（DXGI桌面复制，画面不变时几乎零拷贝；仅Windows可用）
+_CAM = None
+_CAM_FAILED = False
+_LAST_CAM_FRAME = None  # (bbox, frame)：桌面无变化时DXGI不产出新帧，复用上一帧
+
+
+def _grab_array(bbox=None):
+    """
+    抓取屏幕为RGB ndarray
+    依次尝试dxcam（DXGI桌面复制）、mss、ImageGrab，失败自动降级
+    """
+    global _SCT, _CAM, _CAM_FAILED, _LAST_CAM_FRAME
+    if DXCAM_AVAILABLE and not _CAM_FAILED:
+        try:
+            if _CAM is None:
+                _CAM = dxcam.create(output_idx=0, output_color="RGB")
+            frame = _CAM.grab(region=bbox) if bbox is not None else _CAM.grab()
+            if frame is None and _LAST_CAM_FRAME is not None \
+                    and _LAST_CAM_FRAME[0] == bbox:
+                # 画面没有变化：返回上一帧，下游的帧去重会跳过OCR
+                return _LAST_CAM_FRAME[1]
+            if frame is not None:
+                _LAST_CAM_FRAME = (bbox, frame)
+                return frame
+        except Exception as e:
+            logger.debug(f"dxcam抓屏失败，回退到mss/ImageGrab: {e}")
+            _CAM_FAILED = True
+    if MSS_AVAILABLE:
+        try:
+            if _SCT is None:
+                _SCT = mss.mss()
+            if bbox is not None:
+                x1, y1, x2, y2 = bbox
+                monitor = {"left": x1, "top": y1,
+                           "width": x2 - x1, "height": y2 - y1}
+            else:
+                # monitors[0]是所有显示器拼成的虚拟屏；取monitors[1]（主显示器）
+                # 与ImageGrab.grab()和_get_screen_size()的主屏语义保持一致
+                monitor = _SCT.monitors[1]
+            shot = _SCT.grab(monitor)
+            # mss返回BGRA缓冲，直接切片翻转通道取RGB，不经过PIL
+            return np.ascontiguousarray(np.asarray(shot)[:, :, 2::-1])
+        except Exception as e:
+            logger.debug(f"mss抓屏失败，回退到ImageGrab: {e}")
+    return np.asarray(ImageGrab.grab(bbox=bbox))
+
+
+# 默认的截图保存线程池：调用方没传executor时也能异步落盘，
+# 首次用到时才创建，进程退出时等待未完成的写盘任务
+_SAVE_POOL = None
+_save_pool_lock = threading.Lock()
+
+
+def _get_save_pool():
+    """获取（或惰性创建）模块级截图保存线程池"""
+    global _SAVE_POOL
+    if _SAVE_POOL is None:
+        with _save_pool_lock:
+            if _SAVE_POOL is None:
+                _SAVE_POOL = ThreadPoolExecutor(
+                    max_workers=2, thread_name_prefix='screenshot-save')
+                atexit.register(_SAVE_POOL.shutdown, wait=True)
+    return _SAVE_POOL
+
+
+# 屏幕尺寸缓存：避免每次ROI裁剪前都为了读尺寸抓一次全屏
+_SCREEN_SIZE = None
+
+
+def _get_screen_size():
+    """
+    获取并缓存屏幕尺寸（整个进程只探测一次）
+    依次尝试Windows API、tkinter，最后才退化到一次性的全屏抓取
+    """
+    global _SCREEN_SIZE
+    if _SCREEN_SIZE is not None:
+        return _SCREEN_SIZE
+
+    try:
+        from ctypes import windll
+        _SCREEN_SIZE = (windll.user32.GetSystemMetrics(0),
+                        windll.user32.GetSystemMetrics(1))
+        return _SCREEN_SIZE
+    except Exception:
+        pass
+
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+        _SCREEN_SIZE = (root.winfo_screenwidth(), root.winfo_screenheight())
+        root.destroy()
+        return _SCREEN_SIZE
+    except Exception:
+        pass
+
+    # 最后手段：全屏抓一次读尺寸（仅发生一次，之后走缓存）
+    temp = ImageGrab.grab()
+    _SCREEN_SIZE = temp.size
+    temp.close()
+    return _SCREEN_SIZE
+
+
+def _save_screenshot_file(img_array, filename, compress_level=1):
+    """编码并写出截图文件（可提交到IO线程执行，不阻塞扫描线程）"""
+    try:
+        if filename.lower().endswith(('.jpg', '.jpeg')):
+            # libjpeg编码远快于PNG的zlib deflate，适合临时调试截图
+            # subsampling=2（4:2:0色度抽样）再省约一半编码量，屏幕文字几乎无感
+            Image.fromarray(img_array).save(filename, quality=85, subsampling=2)
+        else:
+            # zlib压缩级别降到1：编码快3-5倍，文件约大1.5倍，调试截图可接受
+            Image.fromarray(img_array).save(
+                filename, compress_level=compress_level, optimize=False)
+        logger.debug(f"截图已保存: {filename}")
+    except Exception as e:
+        logger.error(f"保存截图失败: {e}", exc_info=True)
+
 
 def select_roi_interactive(parent=None):
     """
@@ -25,9 +162,7 @@ def select_roi_interactive(parent=None):
     """
     try:
         import tkinter as tk
-        from tkinter import messagebox
-        from PIL import ImageTk
-        
+
         logger.info("[ROI选择模式]")
         logger.info("请按照以下步骤选择ROI区域：")
         logger.info("1. 将鼠标移动到要识别区域的左上角")
@@ -36,10 +171,9 @@ def select_roi_interactive(parent=None):
         logger.info("4. 按ESC键取消选择")
         logger.info("提示：选择完成后，该区域将用于后续的OCR识别")
         
-        # 捕获整个屏幕
-        screenshot = ImageGrab.grab()
-        width, height = screenshot.size
-        
+        # 只需屏幕尺寸，不再抓取整屏做背景图
+        width, height = _get_screen_size()
+
         # 创建窗口：如果有父窗口，使用Toplevel；否则创建新的Tk根窗口
         if parent is not None:
             root = tk.Toplevel(parent)
@@ -52,38 +186,48 @@ def select_roi_interactive(parent=None):
         root.geometry(f"{width}x{height}")
         root.attributes('-fullscreen', True)
         root.attributes('-topmost', True)  # 确保窗口在最上层
-        root.attributes('-alpha', 0.5)  # 半透明，便于看到下方内容
-        
-        # 显示截图
-        photo = ImageTk.PhotoImage(screenshot)
-        canvas = tk.Canvas(root, width=width, height=height, cursor='crosshair')
+        # 纯半透明暗色遮罩：下方屏幕内容自然透出，
+        # 免去整屏截图+PhotoImage（4K下约30MB的Tk图像内存），拖动重绘也快得多
+        root.attributes('-alpha', 0.3)
+
+        canvas = tk.Canvas(root, width=width, height=height, bg='black',
+                           highlightthickness=0, cursor='crosshair')
         canvas.pack(fill='both', expand=True)
-        # 保存photo引用到canvas，防止被垃圾回收
-        canvas.photo = photo
-        canvas.create_image(0, 0, image=photo, anchor='nw')
-        
+
         # ROI选择变量
-        roi_data = {'start': None, 'end': None, 'rect': None, 'completed': False}
-        
+        roi_data = {'start': None, 'end': None, 'rect': None, 'completed': False,
+                    'pending': None, 'scheduled': False}
+
         def on_mouse_down(event):
             logger.debug(f"鼠标按下: ({event.x}, {event.y})")
             roi_data['start'] = (event.x, event.y)
             roi_data['end'] = None
             roi_data['completed'] = False
-        
-        def on_mouse_drag(event):
-            if roi_data['start']:
-                roi_data['end'] = (event.x, event.y)
-                # 绘制矩形
-                if roi_data['rect']:
-                    canvas.delete(roi_data['rect'])
-                x1, y1 = roi_data['start']
-                x2, y2 = event.x, event.y
+
+        def redraw_rect():
+            # 事件队列空闲时才真正重绘，把高回报率鼠标的上千次/秒事件
+            # 合并为每帧一次；用coords原地改矩形而不是删除重建
+            roi_data['scheduled'] = False
+            if not (roi_data['start'] and roi_data['pending']):
+                return
+            x1, y1 = roi_data['start']
+            x2, y2 = roi_data['pending']
+            if roi_data['rect'] is None:
                 roi_data['rect'] = canvas.create_rectangle(
                     x1, y1, x2, y2,
                     outline='red', width=1
                 )
-        
+            else:
+                canvas.coords(roi_data['rect'], x1, y1, x2, y2)
+
+        def on_mouse_drag(event):
+            if roi_data['start']:
+                roi_data['end'] = (event.x, event.y)
+                roi_data['pending'] = (event.x, event.y)
+                if not roi_data['scheduled']:
+                    roi_data['scheduled'] = True
+                    root.after_idle(redraw_rect)
+
         def on_mouse_up(event):
             if roi_data['start']:
                 logger.debug(f"鼠标释放: ({event.x}, {event.y})")
@@ -136,37 +280,36 @@ def select_roi_interactive(parent=None):
         return None
 
 
-def scan_screen(save_dir="output", save_file=True, timestamp=None, roi=None, padding=10):
+def scan_screen(save_dir="output", save_file=True, timestamp=None, roi=None, padding=10,
+                executor=None, image_format='png', max_dimension=1280, for_ocr=False):
     """
     扫描当前屏幕并保存截图
-    
+
     Args:
         save_dir (str): 截图保存目录，默认为 "output"
         save_file (bool): 是否保存文件，默认为 True
         timestamp (str): 时间戳，用于生成文件名。如果为None，则自动生成
         roi (tuple): 感兴趣区域 (x1, y1, x2, y2)，默认为None（全屏）
         padding (int): 边距（像素），默认为10。用于扩展ROI区域，避免文字太靠近边框
-    
+        executor: 可选的线程池。提供时图片编码/写盘在后台执行，本函数立即返回
+        image_format (str): 截图保存格式，'png' 或 'jpg'（jpg编码快得多），默认 'png'
+        max_dimension (int): 长边超过该值时双线性缩小再返回，可大幅降低OCR预处理量。
+            默认1280，传None或0表示不缩放
+        for_ocr (bool): 为True时转为单通道灰度图再返回/保存（字节量降为1/3）。
+            OCR内部本就按灰度处理，屏幕文字识别不受影响；默认False保持RGB
+
     Returns:
-        tuple: (PIL.Image截图对象, str时间戳)，如果出错返回 (None, None)
+        tuple: (numpy.ndarray截图数组(RGB, uint8), str时间戳, float缩放系数)，
+            缩放系数用于把OCR坐标映射回屏幕坐标；如果出错返回 (None, None, 1.0)
     """
     try:
         # 捕获屏幕（支持ROI，直接抓取指定区域以优化性能）
         if roi is not None:
             x1, y1, x2, y2 = roi
             
-            # 获取屏幕尺寸（仅用于边界检查）
-            try:
-                # 尝试获取屏幕尺寸，如果失败则不进行边界检查
-                from ctypes import windll
-                screen_width = windll.user32.GetSystemMetrics(0)
-                screen_height = windll.user32.GetSystemMetrics(1)
-            except:
-                # 如果无法获取屏幕尺寸，先全屏抓取一次获取尺寸（仅一次）
-                temp = ImageGrab.grab()
-                screen_width, screen_height = temp.size
-                temp.close()
-            
+            # 获取屏幕尺寸（仅用于边界检查，进程内缓存）
+            screen_width, screen_height = _get_screen_size()
+
             # 添加边距，避免文字太靠近边框
             x1 = max(0, x1 - padding)
             y1 = max(0, y1 - padding)
@@ -174,31 +317,51 @@ def scan_screen(save_dir="output", save_file=True, timestamp=None, roi=None, pad
             y2 = min(screen_height, y2 + padding)
             
             # 直接抓取指定区域
-            screenshot = ImageGrab.grab(bbox=(x1, y1, x2, y2))
+            img_array = _grab_array(bbox=(x1, y1, x2, y2))
             logger.info(f"使用ROI区域: ({x1}, {y1}, {x2}, {y2}), 边距: {padding}px")
         else:
-            screenshot = ImageGrab.grab()
-        
-        # 获取截图尺寸
-        width, height = screenshot.size
-        
+            img_array = _grab_array()
+
+        # 此时已是numpy数组（RGB），下游OCR可直接消费，
+        # 避免每帧再做一次PIL→ndarray拷贝
+        height, width = img_array.shape[:2]
+
+        # 长边超限时先缩小：4K原图直送OCR要处理8百万像素，
+        # 缩到1280长边后速度约3倍且屏幕文字识别几乎无损
+        scale = 1.0
+        if max_dimension:
+            scale = min(max_dimension / width, max_dimension / height, 1.0)
+            if scale < 1.0:
+                new_size = (int(width * scale), int(height * scale))
+                img_array = np.asarray(
+                    Image.fromarray(img_array).resize(new_size, Image.BILINEAR))
+                height, width = img_array.shape[:2]
+
+        # OCR专用路径：转单通道灰度（PIL的C层luma转换），
+        # 后续预处理/落盘的数据量降为1/3
+        if for_ocr and img_array.ndim == 3:
+            img_array = np.asarray(Image.fromarray(img_array).convert('L'))
+
+
         if save_file:
-            # 创建保存截图的目录
-            if not os.path.exists(save_dir):
-                os.makedirs(save_dir)
-            
+            # 创建保存截图的目录（exist_ok避免先exists后makedirs的双重syscall）
+            os.makedirs(save_dir, exist_ok=True)
+
             # 生成文件名（使用时间戳）
             if timestamp is None:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            # 如果save_dir已经是时间戳文件夹，则直接使用screenshot.png
+            ext = 'jpg' if str(image_format).lower() in ('jpg', 'jpeg') else 'png'
+            # 如果save_dir已经是时间戳文件夹，则直接使用screenshot.<ext>
             if os.path.basename(save_dir) == timestamp:
-                filename = os.path.join(save_dir, "screenshot.png")
+                filename = os.path.join(save_dir, f"screenshot.{ext}")
             else:
-                filename = os.path.join(save_dir, f"screenshot_{timestamp}.png")
-            
-            # 保存截图
-            screenshot.save(filename)
+                filename = os.path.join(save_dir, f"screenshot_{timestamp}.{ext}")
             
+            # 保存截图：异步编码写盘，扫描线程直接进入OCR
+            # （调用方没传executor时使用模块级默认线程池）
+            pool = executor if executor is not None else _get_save_pool()
+            pool.submit(_save_screenshot_file, img_array, filename)
+
             roi_info = f" ROI: {roi}" if roi else ""
             logger.info(f"屏幕扫描完成 - 尺寸: {width}x{height}{roi_info}, 已保存: {filename}")
         else:
@@ -206,12 +369,12 @@ def scan_screen(save_dir="output", save_file=True, timestamp=None, roi=None, pad
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             roi_info = f" ROI: {roi}" if roi else ""
             logger.info(f"屏幕扫描完成 - 尺寸: {width}x{height}{roi_info}")
-        
-        return screenshot, timestamp
-        
+
+        return img_array, timestamp, scale
+
     except Exception as e:
         logger.error(f"扫描屏幕时出错: {e}", exc_info=True)
-        return None, None
+        return None, None, 1.0
 
 
 if __name__ == "__main__":
@@ -230,7 +393,7 @@ if __name__ == "__main__":
         if roi is None:
             print("ROI选择取消，使用全屏扫描")
     
-    screenshot, timestamp = scan_screen(roi=roi)
-    if screenshot:
+    screenshot, timestamp, _ = scan_screen(roi=roi)
+    if screenshot is not None:
         print(f"扫描成功，时间戳: {timestamp}")
 
@@ -3,26 +3,45 @@
 从OCR结果中提取文字，与TXT文件进行对比，匹配成功后在屏幕上显示
 """
 
+import bisect
+import glob
+import hashlib
 import os
+import pickle
+import re
 import threading
+import time
 import tkinter as tk
+import tkinter.font as tkfont
 
 from .logger import logger
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 
 class TextMatcher:
     """文字匹配器"""
-    
+
+    # mtime探测的最小间隔（秒）：人手改banlist不会快过1秒，
+    # 扫描循环里没必要每次匹配都做一次stat
+    _MTIME_CHECK_INTERVAL = 1.0
+
     def __init__(self, txt_file="docs/banlist.txt"):
         """
         初始化文字匹配器
-        
+
         Args:
             txt_file (str): 关键词TXT文件路径，默认为 docs/banlist.txt
         """
         self.txt_file = txt_file
         self.keywords = []
         self._last_mtime = None
+        self._automaton = None
+        self._next_mtime_check = 0.0
         self.keywords = self._load_keywords()
     
     def _load_keywords(self):
@@ -30,12 +49,18 @@ class TextMatcher:
         keywords = []
         if os.path.exists(self.txt_file):
             try:
-                self._last_mtime = os.path.getmtime(self.txt_file)
-                with open(self.txt_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            keywords.append(line)
+                self._last_mtime = os.stat(self.txt_file).st_mtime
+                # 一次性读入整个文件再在C层切分，
+                # 比逐行迭代+strip的Python循环快得多
+                with open(self.txt_file, 'rb') as f:
+                    raw = f.read()
+                keywords = [ln for ln in (s.strip() for s in raw.decode('utf-8').splitlines()) if ln]
+                # 去重（保持首次出现的顺序），重复项只会浪费匹配时间
+                unique = list(dict.fromkeys(keywords))
+                if len(unique) != len(keywords):
+                    logger.warning(
+                        f"关键词文件包含 {len(keywords) - len(unique)} 个重复项，已去重")
+                    keywords = unique
                 logger.info(f"已加载 {len(keywords)} 个关键词")
             except Exception as e:
                 logger.error(f"加载关键词文件失败: {e}", exc_info=True)
@@ -44,8 +69,98 @@ class TextMatcher:
             # 创建默认关键词文件
             self._create_default_keywords_file()
             self._last_mtime = None
-        
+
+        # frozenset用于O(1)的整句精确命中；最短关键词长度用于跳过太短的OCR文本
+        self._keyword_set = frozenset(keywords)
+        self._min_kw_len = min((len(k) for k in keywords), default=0)
+        # 按长度降序的副本，供需要最长匹配优先语义的扫描路径使用
+        self._keywords_sorted = sorted(keywords, key=len, reverse=True)
+        # 关键词 -> 它的也是关键词的真前缀列表；正则回退路径在同一起点
+        # 只会报出最长的那个关键词，被遮蔽的必然是它的前缀，用此表补齐
+        self._prefix_kw = {}
+        for k in keywords:
+            prefixes = [k[:i] for i in range(self._min_kw_len, len(k))
+                        if k[:i] in self._keyword_set]
+            if prefixes:
+                self._prefix_kw[k] = prefixes
+        self._automaton = self._load_or_build_automaton(keywords)
+        self._pattern = (self._build_pattern(self._keywords_sorted)
+                         if self._automaton is None else None)
         return keywords
+
+    def _build_pattern(self, keywords_sorted):
+        """
+        把关键词编译为一个正则交替式（pyahocorasick不可用时的次优路径）
+        整体包在零宽环视里，findall一次C层扫描即可命中重叠的关键词
+        （普通交替式是非重叠匹配，'badword'里嵌着的'word'会被吞掉）；
+        传入按长度降序的列表以保证同一起点取最长匹配，
+        被遮蔽的前缀关键词由_prefix_kw补齐
+        """
+        if not keywords_sorted:
+            return None
+        try:
+            alternation = '|'.join(re.escape(k) for k in keywords_sorted)
+            return re.compile(f'(?=({alternation}))')
+        except re.error as e:
+            logger.warning(f"编译关键词正则失败，回退到逐词匹配: {e}")
+            return None
+
+    def _load_or_build_automaton(self, keywords):
+        """
+        加载或构建关键词自动机
+        构建好的自动机会pickle到banlist旁的 <banlist>.<哈希>.ac.pkl 文件，
+        下次启动时直接反序列化，省去大词表的trie构建时间；
+        banlist内容变化时哈希不同，旧的缓存文件会被清理
+        """
+        if not AHOCORASICK_AVAILABLE or not keywords:
+            return None
+
+        cache_path = None
+        try:
+            with open(self.txt_file, 'rb') as f:
+                digest = hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+            cache_path = f"{self.txt_file}.{digest}.ac.pkl"
+            if os.path.exists(cache_path):
+                with open(cache_path, 'rb') as f:
+                    automaton = pickle.load(f)
+                logger.debug(f"已从缓存加载关键词自动机: {cache_path}")
+                return automaton
+        except Exception as e:
+            logger.debug(f"加载关键词自动机缓存失败，将重新构建: {e}")
+
+        automaton = self._build_automaton(keywords)
+
+        if automaton is not None and cache_path is not None:
+            try:
+                # 清理旧banlist内容对应的缓存文件
+                for stale in glob.glob(f"{self.txt_file}.*.ac.pkl"):
+                    if stale != cache_path:
+                        os.remove(stale)
+                with open(cache_path, 'wb') as f:
+                    pickle.dump(automaton, f, protocol=pickle.HIGHEST_PROTOCOL)
+                logger.debug(f"关键词自动机已缓存到: {cache_path}")
+            except Exception as e:
+                logger.debug(f"缓存关键词自动机失败: {e}")
+
+        return automaton
+
+    def _build_automaton(self, keywords):
+        """
+        用关键词构建Aho-Corasick自动机（仅在pyahocorasick可用时）
+        匹配时一次线性扫描即可命中所有关键词，复杂度从O(K×N)降为O(N+命中数)
+        """
+        if not AHOCORASICK_AVAILABLE or not keywords:
+            return None
+
+        try:
+            automaton = ahocorasick.Automaton()
+            for keyword in keywords:
+                automaton.add_word(keyword, keyword)
+            automaton.make_automaton()
+            return automaton
+        except Exception as e:
+            logger.warning(f"构建关键词自动机失败，回退到逐词匹配: {e}")
+            return None
     
     def _create_default_keywords_file(self):
         """创建默认关键词文件（如果不存在）"""
@@ -67,54 +182,273 @@ class TextMatcher:
         self.keywords = self._load_keywords()
 
     def reload_if_changed(self):
-        """如果关键词文件已更新则重新加载"""
-        if not os.path.exists(self.txt_file):
-            # 文件不存在时保持现有关键词，避免频繁清空
+        """如果关键词文件已更新则重新加载（mtime探测按时间节流）"""
+        now = time.monotonic()
+        if now < self._next_mtime_check:
             return
-        
+        self._next_mtime_check = now + self._MTIME_CHECK_INTERVAL
+
+        # 单次stat同时覆盖存在性和mtime检查；
+        # 文件不存在/暂不可读时保持现有关键词，避免频繁清空
         try:
-            current_mtime = os.path.getmtime(self.txt_file)
-        except Exception:
+            st = os.stat(self.txt_file)
+        except OSError:
             return
-        
-        if self._last_mtime is None or current_mtime != self._last_mtime:
+
+        if self._last_mtime is None or st.st_mtime != self._last_mtime:
             self.reload_keywords()
     
     def match(self, ocr_results):
         """
         匹配OCR结果中的关键词（基于字符串包含）
-        
+
         Args:
-            ocr_results (list): OCR识别结果列表，每个元素是包含'text'键的字典
-        
+            ocr_results: OCR识别结果，可以是包含'text'键的字典列表、
+                字符串列表或单个字符串
+
+        Returns:
+            list: 匹配到的关键词列表
+        """
+        # 统一成字符串列表后交给match_texts；
+        # 已持有纯文本的调用方可直接调match_texts省去这层分发
+        if isinstance(ocr_results, str):
+            ocr_texts = [ocr_results]
+        elif ocr_results and isinstance(ocr_results[0], str):
+            ocr_texts = ocr_results
+        else:
+            ocr_texts = [r['text'] for r in ocr_results
+                         if isinstance(r, dict) and 'text' in r]
+        return self.match_texts(ocr_texts)
+
+    def match_texts(self, ocr_texts):
+        """
+        在纯文本列表中匹配关键词（match的无提取快路径）
+
+        Args:
+            ocr_texts (list): 字符串列表
+
         Returns:
             list: 匹配到的关键词列表
         """
         matched_keywords = []
-        
+
         if not self.keywords:
             return matched_keywords
-        
-        # 从OCR结果中提取所有文字
-        ocr_texts = []
-        for result in ocr_results:
-            if isinstance(result, dict) and 'text' in result:
-                ocr_texts.append(result['text'])
-        
-        # 检查每个关键词是否在OCR结果中
-        for keyword in self.keywords:
-            for ocr_text in ocr_texts:
-                # 检查关键词是否包含在OCR结果中
-                if keyword in ocr_text:
+
+        # 预筛：比最短关键词还短的文本不可能命中，直接丢弃；
+        # 整句恰好等于某个关键词时用frozenset O(1)提前命中
+        # （该行仍要进入子串扫描：它可能还包含其他更短的关键词）
+        seen = set()
+        candidates = []
+        for ocr_text in ocr_texts:
+            if len(ocr_text) < self._min_kw_len:
+                continue
+            if ocr_text in self._keyword_set and ocr_text not in seen:
+                seen.add(ocr_text)
+                matched_keywords.append(ocr_text)
+                logger.info(f"匹配成功: '{ocr_text}'")
+            candidates.append(ocr_text)
+
+        if not candidates:
+            pass
+        elif self._automaton is not None:
+            # Aho-Corasick路径：所有OCR文字拼成一串，一次线性扫描命中全部关键词
+            # （\x01哨兵字符不会出现在OCR文本和关键词中，可防止跨行拼出假匹配）
+            joined = '\x01'.join(candidates)
+            for _, keyword in self._automaton.iter(joined):
+                if keyword not in seen:
+                    seen.add(keyword)
                     matched_keywords.append(keyword)
-                    logger.info(f"匹配成功: '{keyword}' (OCR: '{ocr_text}')")
-                    break
+                    logger.info(f"匹配成功: '{keyword}'")
+        else:
+            # 回退路径：把所有OCR文字用哨兵字符拼成一个haystack
+            # （\x00不会出现在OCR文本中，可防止跨行拼接出假匹配）
+            haystack = '\x00'.join(candidates)
+            if self._pattern is not None:
+                # 环视交替式一次findall命中所有关键词（含重叠），
+                # 同一起点被更长关键词遮蔽的前缀关键词从_prefix_kw补齐
+                for keyword in self._pattern.findall(haystack):
+                    if keyword not in seen:
+                        seen.add(keyword)
+                        matched_keywords.append(keyword)
+                        logger.info(f"匹配成功: '{keyword}'")
+                    for prefix in self._prefix_kw.get(keyword, ()):
+                        if prefix not in seen:
+                            seen.add(prefix)
+                            matched_keywords.append(prefix)
+                            logger.info(f"匹配成功: '{prefix}'")
+            else:
+                # 每个关键词只做一次C层的子串扫描，避免K×N层Python循环
+                for keyword in self.keywords:
+                    if keyword not in seen and keyword in haystack:
+                        matched_keywords.append(keyword)
+                        logger.info(f"匹配成功: '{keyword}'")
         
         if matched_keywords:
             logger.info(f"总共匹配到 {len(matched_keywords)} 个关键词")
-        
+
         return matched_keywords
 
+    def match_batch(self, batches):
+        """
+        批量匹配多份OCR结果，整个批次只做一次自动机扫描
+
+        Args:
+            batches (list): 每个元素是一份OCR结果（格式同match的入参）
+
+        Returns:
+            list: 与batches等长的列表，每个元素是对应批次匹配到的关键词列表
+        """
+        if not batches:
+            return []
+        if not self.keywords:
+            return [[] for _ in batches]
+
+        # 每份结果统一提取为字符串列表
+        texts_per_batch = []
+        for ocr_results in batches:
+            if isinstance(ocr_results, str):
+                texts_per_batch.append([ocr_results])
+            elif ocr_results and isinstance(ocr_results[0], str):
+                texts_per_batch.append(ocr_results)
+            else:
+                texts_per_batch.append([r['text'] for r in ocr_results
+                                        if isinstance(r, dict) and 'text' in r])
+
+        if self._automaton is None:
+            # 没有自动机时逐批走普通路径
+            return [self.match_texts(texts) for texts in texts_per_batch]
+
+        # \x02分隔批内文本、\x03分隔批次（两者都不会出现在OCR文本和关键词中），
+        # 单次线性扫描后用bisect把命中位置映射回所属批次
+        joined = '\x03'.join('\x02'.join(texts) for texts in texts_per_batch)
+        offsets = []  # 每个批次片段的结束位置（不含批间分隔符）
+        pos = 0
+        for texts in texts_per_batch:
+            if texts:
+                pos += sum(len(t) for t in texts) + len(texts) - 1
+            offsets.append(pos)
+            pos += 1  # 批间分隔符
+
+        matched = [[] for _ in batches]
+        seen = [set() for _ in batches]
+        for end_pos, keyword in self._automaton.iter(joined):
+            idx = bisect.bisect_right(offsets, end_pos)
+            if keyword not in seen[idx]:
+                seen[idx].add(keyword)
+                matched[idx].append(keyword)
+        return matched
+
+
+# 复用的字体测量对象：tkfont.Font.measure直接查询字体引擎，
+# 无需像临时Label那样走一遍完整的控件创建/布局/销毁
+_FONT_CACHE = {}
+
+
+# 常驻的隐藏Tk根窗口（命令行模式下所有水印浮窗共用）
+_ui_root = None
+_ui_ready = threading.Event()
+_ui_lock = threading.Lock()
+
+
+def _ensure_ui_root():
+    """
+    确保后台UI线程及隐藏的Tk根窗口已启动（整个进程只创建一次）
+    每次匹配都新建tk.Tk()要付出约50-100ms的Tcl解释器初始化，
+    常驻隐藏根窗口后，浮窗只需创建轻量的Toplevel
+    """
+    global _ui_root
+    with _ui_lock:
+        if _ui_root is not None:
+            return _ui_root
+        if not _ui_ready.is_set():
+            def _run():
+                global _ui_root
+                try:
+                    root = tk.Tk()
+                    root.withdraw()
+                    _ui_root = root
+                    _ui_ready.set()
+                    root.mainloop()
+                except Exception as e:
+                    logger.error(f"启动水印UI线程失败: {e}")
+                    _ui_ready.set()
+
+            threading.Thread(target=_run, name='watermark-ui', daemon=True).start()
+    _ui_ready.wait(timeout=5)
+    return _ui_root
+
+
+# 浮窗复用池：关闭的水印窗口withdraw后归还到这里，
+# 下次显示直接改内容复用，省去Toplevel+Canvas的创建和系统属性设置
+_TOPLEVEL_POOL = []
+_POOL_MAX = 4
+
+
+def _acquire_pooled_window(master):
+    """从池中取一个挂在master下的浮窗，没有则新建并做一次性属性设置"""
+    for i in range(len(_TOPLEVEL_POOL) - 1, -1, -1):
+        pool_master, top, canvas = _TOPLEVEL_POOL[i]
+        if pool_master is master:
+            del _TOPLEVEL_POOL[i]
+            try:
+                if top.winfo_exists():
+                    return top, canvas
+            except Exception:
+                pass
+
+    top = tk.Toplevel(master)
+    top.overrideredirect(True)  # 无边框
+    top.attributes('-topmost', True)  # 置顶
+
+    # 设置为工具窗口，减少系统干扰
+    try:
+        top.attributes('-toolwindow', True)
+    except:
+        pass
+
+    # 关键：设置透明背景，让鼠标事件穿透
+    top.attributes('-transparentcolor', 'black')
+    top.config(bg='black')
+    top.attributes('-alpha', 0.7)
+
+    # 允许鼠标穿透窗口（Windows API）
+    try:
+        from ctypes import windll
+        hwnd = windll.user32.GetParent(top.winfo_id())
+        GWL_EXSTYLE = -20
+        WS_EX_LAYERED = 0x00080000
+        WS_EX_TRANSPARENT = 0x00000020
+        style = windll.user32.GetWindowLongW(hwnd, GWL_EXSTYLE)
+        windll.user32.SetWindowLongW(hwnd, GWL_EXSTYLE, style | WS_EX_LAYERED | WS_EX_TRANSPARENT)
+    except:
+        pass
+
+    # 防止窗口出现在任务栏
+    try:
+        top.attributes('-type', 'splash')
+    except:
+        pass
+
+    canvas = tk.Canvas(top, bg='black', highlightthickness=0, takefocus=False)
+    canvas.pack(fill='both', expand=True)
+    return top, canvas
+
+
+def _release_pooled_window(top, canvas):
+    """把浮窗隐藏并归还池中；池满或窗口已失效则直接销毁"""
+    try:
+        top.withdraw()
+        if len(_TOPLEVEL_POOL) < _POOL_MAX and top.winfo_exists():
+            _TOPLEVEL_POOL.append((top.master, top, canvas))
+            return
+    except Exception:
+        pass
+    try:
+        top.destroy()
+    except:
+        pass
+
 
 class FloatingTextDisplay:
     """遮罩式文字显示器（水印效果）"""
@@ -136,6 +470,7 @@ class FloatingTextDisplay:
         self.font_size = font_size
         self.parent_root = parent_root
         self.root = None
+        self._canvas = None
 
     def show(self):
         """显示遮罩文字（水印效果）"""
@@ -143,91 +478,40 @@ class FloatingTextDisplay:
             # 如果有父窗口，在主线程中调度显示
             self.parent_root.after(0, self._show_in_main_thread)
         else:
-            # 如果没有父窗口（命令行模式），在新线程中显示
-            # 注意：如果主线程没有运行mainloop，这里创建tk.Tk()是安全的
-            # 但如果主线程有mainloop，这里会报错。所以确保只在命令行模式下使用无parent_root的方式
-            thread = threading.Thread(target=self._show_standalone, daemon=True)
-            thread.start()
+            # 命令行模式：复用常驻的隐藏根窗口，浮窗以Toplevel形式创建，
+            # 避免每次匹配都初始化一个新的Tcl解释器
+            ui_root = _ensure_ui_root()
+            if ui_root is not None:
+                ui_root.after(0, lambda: self._show_as_toplevel(ui_root))
 
     def _show_in_main_thread(self):
         """在主线程中显示（使用Toplevel）"""
+        self._show_under(self.parent_root)
+
+    def _show_as_toplevel(self, ui_root):
+        """在常驻UI线程中显示（使用隐藏根窗口下的Toplevel）"""
+        self._show_under(ui_root)
+
+    def _show_under(self, master):
+        """取池中（或新建）的浮窗，填入内容并定时关闭"""
         try:
-            self.root = tk.Toplevel(self.parent_root)
-            self._setup_window()
-            
+            self.root, self._canvas = _acquire_pooled_window(master)
+            self._render()
+
             # 定时关闭
             self.root.after(int(self.duration * 1000), self._close)
         except Exception as e:
             logger.error(f"显示水印文字失败: {e}")
 
-    def _show_standalone(self):
-        """独立显示（创建新的Tk实例）"""
-        try:
-            self.root = tk.Tk()
-            self._setup_window()
-            
-            # 定时关闭
-            self.root.after(int(self.duration * 1000), self._close_standalone)
-            
-            self.root.mainloop()
-        except Exception as e:
-            logger.error(f"显示独立水印文字失败: {e}")
-
     def _close(self):
-        """关闭窗口"""
-        if self.root:
-            try:
-                self.root.destroy()
-            except:
-                pass
-            self.root = None
-
-    def _close_standalone(self):
-        """关闭独立窗口"""
+        """关闭窗口（归还复用池而非销毁）"""
         if self.root:
-            try:
-                self.root.destroy()
-                # 退出mainloop
-                self.root.quit()
-            except:
-                pass
+            _release_pooled_window(self.root, self._canvas)
             self.root = None
+            self._canvas = None
 
-    def _setup_window(self):
-        """设置窗口属性和内容"""
-        self.root.overrideredirect(True)  # 无边框
-        self.root.attributes('-topmost', True)  # 置顶
-
-        # 设置为工具窗口，减少系统干扰
-        try:
-            self.root.attributes('-toolwindow', True)
-        except:
-            pass
-
-        # 关键：设置透明背景，让鼠标事件穿透
-        self.root.attributes('-transparentcolor', 'black')
-        self.root.config(bg='black')
-        self.root.attributes('-alpha', 0.7)
-
-        # 允许鼠标穿透窗口（Windows API）
-        try:
-            import ctypes
-            from ctypes import windll
-            hwnd = windll.user32.GetParent(self.root.winfo_id())
-            GWL_EXSTYLE = -20
-            WS_EX_LAYERED = 0x00080000
-            WS_EX_TRANSPARENT = 0x00000020
-            style = windll.user32.GetWindowLongW(hwnd, GWL_EXSTYLE)
-            windll.user32.SetWindowLongW(hwnd, GWL_EXSTYLE, style | WS_EX_LAYERED | WS_EX_TRANSPARENT)
-        except:
-            pass
-
-        # 防止窗口出现在任务栏
-        try:
-            self.root.attributes('-type', 'splash')
-        except:
-            pass
-
+    def _render(self):
+        """按当前文字内容设置窗口几何并重绘Canvas"""
         # 获取屏幕尺寸
         screen_width = self.root.winfo_screenwidth()
         screen_height = self.root.winfo_screenheight()
@@ -241,16 +525,9 @@ class FloatingTextDisplay:
         window_height = text_height + padding * 2
         self.root.geometry(f"{window_width}x{window_height}+{window_x}+{window_y}")
 
-        # 创建Canvas
-        canvas = tk.Canvas(
-            self.root,
-            width=window_width,
-            height=window_height,
-            bg='black',
-            highlightthickness=0,
-            takefocus=False
-        )
-        canvas.pack()
+        canvas = self._canvas
+        canvas.config(width=window_width, height=window_height)
+        canvas.delete('all')
 
         # 计算文字在Canvas中的位置
         text_x = window_width // 2
@@ -283,28 +560,30 @@ class FloatingTextDisplay:
         # 重新排列图层
         canvas.tag_raise('watermark_text', 'watermark_shadow')
 
+        # 复用池里的窗口处于withdraw状态，重新显示
+        self.root.deiconify()
+
 
     def _calculate_window_geometry(self, screen_width, screen_height):
         """计算窗口几何信息（位置和大小）"""
-        # 使用更准确的文字尺寸计算
-        font = ('Microsoft YaHei', self.font_size, 'bold')
-
-        # 创建临时标签来测量文字尺寸
-        temp_label = tk.Label(self.root, text=self.text, font=font)
-        self.root.update_idletasks()  # 确保标签被正确初始化
-
+        # 直接用字体引擎测量文字尺寸（Font对象按字号缓存复用）
         try:
-            # 获取文字的实际尺寸
-            text_width = temp_label.winfo_reqwidth()
-            text_height = temp_label.winfo_reqheight()
-        except:
+            key = ('Microsoft YaHei', self.font_size)
+            fnt = _FONT_CACHE.get(key)
+            try:
+                text_width = fnt.measure(self.text)
+            except Exception:
+                # 未缓存或缓存的Font所属解释器已销毁，重建一次
+                fnt = tkfont.Font(root=self.root, family=key[0],
+                                  size=key[1], weight='bold')
+                _FONT_CACHE[key] = fnt
+                text_width = fnt.measure(self.text)
+            text_height = fnt.metrics('linespace')
+        except Exception:
             # 如果测量失败，使用估算值（根据字体大小动态调整）
             text_width = len(self.text) * int(self.font_size * 0.6)
             text_height = int(self.font_size * 1.2)
 
-        # 销毁临时标签
-        temp_label.destroy()
-
         # 最小边距（用于计算窗口位置时保持一致）
         padding = 2
         window_width = text_width + padding * 2
@@ -336,19 +615,43 @@ _cache_lock = threading.Lock()
 def _get_cached_matcher(txt_file: str) -> TextMatcher:
     """获取（或创建）缓存的关键词匹配器"""
     file_path = os.path.abspath(txt_file)
-    with _cache_lock:
-        matcher = _matcher_cache.get(file_path)
-        if matcher is None:
-            matcher = TextMatcher(file_path)
-            _matcher_cache[file_path] = matcher
-    matcher.reload_if_changed()
+    # 无锁快路径：dict.get在GIL下是原子的，缓存命中（几乎每帧）不必抢锁
+    matcher = _matcher_cache.get(file_path)
+    if matcher is None:
+        with _cache_lock:
+            # 双重检查：拿到锁后可能已被其他线程创建
+            matcher = _matcher_cache.get(file_path)
+            if matcher is None:
+                matcher = TextMatcher(file_path)
+                _matcher_cache[file_path] = matcher
+                return matcher
+    # 时间节流：距上次探测不足间隔时连stat都不做，直接复用
+    now = time.monotonic()
+    if now < matcher._next_mtime_check:
+        return matcher
+    matcher._next_mtime_check = now + TextMatcher._MTIME_CHECK_INTERVAL
+    # 热路径只做一次os.stat：mtime没变就直接复用，不再走exists+getmtime两次syscall
+    try:
+        current_mtime = os.stat(file_path).st_mtime
+    except OSError:
+        # 文件不存在/暂不可读时保持现有关键词，避免频繁清空
+        return matcher
+    if matcher._last_mtime is None or current_mtime != matcher._last_mtime:
+        matcher.reload_keywords()
     return matcher
 
 
+# 水印限流：记录每组关键词最近一次显示的时刻，
+# 10Hz的扫描循环里同一组匹配每帧都弹窗只会堆叠冗余浮窗
+_LAST_SHOWN = {}
+_last_shown_lock = threading.Lock()
+
+
 def display_matches(matched_keywords, duration=3, position="center", font_size=30, parent_root=None):
     """
     显示匹配的关键词
-    
+    相同的一组关键词在duration秒内只显示一次（上一个浮窗还在时不再叠加）
+
     Args:
         matched_keywords (list): 匹配到的关键词列表
         duration (int): 显示时长
@@ -359,7 +662,15 @@ def display_matches(matched_keywords, duration=3, position="center", font_size=3
     if matched_keywords:
         # 将所有匹配的关键词合并为一个字符串
         display_text = " | ".join(matched_keywords)
-        
+
+        # 限流：该组关键词的水印仍在屏幕上时跳过本次显示
+        key = " | ".join(sorted(matched_keywords))
+        now = time.monotonic()
+        with _last_shown_lock:
+            if now - _LAST_SHOWN.get(key, float('-inf')) < duration:
+                return
+            _LAST_SHOWN[key] = now
+
         # 创建并显示浮动文字
         display = FloatingTextDisplay(display_text, duration, position, font_size, parent_root)
         display.show()